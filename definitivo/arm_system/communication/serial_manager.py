@@ -2,14 +2,22 @@ import os
 import sys
 import json
 import time
+import queue
 import serial
 import logging as log
 from typing import Dict, Any, Optional
-from threading import Thread, Event
+from threading import Thread, Event, Lock
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    # fallback for environments without orjson
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+    _json_loads = json.loads
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from perception.vision.camera.main import CameraManager
-from perception.vision.image_processing import ImageProcessor
 
 log.basicConfig(level=log.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -24,11 +32,20 @@ class CommunicationManager:
         self.baudrate = baudrate
         self.message_end = b'\n'
         
+        # pre-encoded '{"type":...,"data":' envelope for the known message types
+        self._envelope_prefix = {
+            msg_type: b'{"type":"' + msg_type.encode() + b'","data":'
+            for msg_type in ('check_service', 'safety_service', 'scan_service',
+                             'pick_service', 'place_service', 'current_angles')
+        }
+        self._envelope_suffix = b'}' + self.message_end
+        
         self.serial_port: Optional[serial.Serial] = None
         self.is_connected = False
         
         # threads / events
         self._read_thread = None
+        self._detection_thread = None
         self._stop_event = Event()
         self.scan_complete_event = Event()
         self.movement_event = Event()
@@ -37,6 +54,9 @@ class CommunicationManager:
         # buffer
         self.buffer = bytearray()
         
+        # pending object detections, drained by a single worker
+        self._detection_queue: queue.Queue = queue.Queue(maxsize=32)
+        
         # callbacks
         self.callbacks = {}
         
@@ -46,8 +66,43 @@ class CommunicationManager:
         self.safety_status: Dict[str, Any] = {}
         self.scan_data = None
         
-        self.camera = CameraManager(camera_index=camera_index)
-        self.object_detect_model = ImageProcessor(confidence_threshold=0.45)
+        # message type -> handler (the VEX brain sends lowercase types)
+        self._handlers = {
+            'check_service': self._handle_check_service,
+            'safety_service': self._handle_safety_service,
+            'scan_service': self._handle_scan_service,
+            'pick_service': self._handle_movement,
+            'place_service': self._handle_movement,
+            'current_angles': self._handle_current_angles,
+        }
+        
+        # vision (cv2, torch, ultralytics) is imported and built on first use, not
+        # at construction; the lock keeps the detection worker and the robot from
+        # building it twice
+        self.camera_index = camera_index
+        self._camera = None
+        self._object_detect_model = None
+        self._vision_lock = Lock()
+        
+    @property
+    def camera(self):
+        """camera, opened on first use"""
+        if self._camera is None:
+            with self._vision_lock:
+                if self._camera is None:
+                    from perception.vision.camera.main import CameraManager
+                    self._camera = CameraManager(camera_index=self.camera_index)
+        return self._camera
+    
+    @property
+    def object_detect_model(self):
+        """image processor on the shared model, built on first use"""
+        if self._object_detect_model is None:
+            with self._vision_lock:
+                if self._object_detect_model is None:
+                    from perception.vision.image_processing import ImageProcessor
+                    self._object_detect_model = ImageProcessor(confidence_threshold=0.45)
+        return self._object_detect_model
                 
     def connect(self) -> bool:
         """serial connection"""
@@ -58,15 +113,20 @@ class CommunicationManager:
             self.serial_port = serial.Serial(
                 port=self.port, 
                 baudrate=self.baudrate,
-                timeout=10,
+                timeout=0.1,  # read returns periodically to check _stop_event
                 write_timeout=10
             )
             self.is_connected = True
             
+            # drop any partial frame left from a previous session
+            self.buffer.clear()
+            
             # read loop
             self._stop_event.clear()
             self._read_thread = Thread(target=self._read_loop, daemon=True)
             self._read_thread.start()
+            self._detection_thread = Thread(target=self._detection_worker, daemon=True)
+            self._detection_thread.start()
             return True
             
         except Exception as e:
@@ -78,6 +138,10 @@ class CommunicationManager:
         self._stop_event.set()
         if self._read_thread:
             self._read_thread.join(timeout=1.0)
+        if self._detection_thread:
+            self._detection_thread.join(timeout=1.0)
+        if self._camera is not None:
+            self._camera.close()
             
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
@@ -95,11 +159,15 @@ class CommunicationManager:
             return False
         
         try:
-            message = {
-                'type': message_type,
-                'data': data,
-            }
-            encoded_message = json.dumps(message).encode() + self.message_end
+            prefix = self._envelope_prefix.get(message_type)
+            if prefix is not None:
+                encoded_message = prefix + _json_dumps(data) + self._envelope_suffix
+            else:
+                message = {
+                    'type': message_type,
+                    'data': data,
+                }
+                encoded_message = _json_dumps(message) + self.message_end
             self.serial_port.write(encoded_message)
             return True
         except Exception as e:
@@ -111,95 +179,118 @@ class CommunicationManager:
         
     def _read_loop(self):
         """Thread loop for read messages from VEX"""
+        end = self.message_end
         while not self._stop_event.is_set():
-            if self.serial_port and self.serial_port.in_waiting:
+            try:
+                # blocks up to the port timeout for the first byte, then drains the burst
+                chunk = self.serial_port.read(self.serial_port.in_waiting or 1)
+            except Exception as e:
+                log.error('error read serial port: %s', e)
+                self._stop_event.wait(0.1)
+                continue
+
+            if not chunk:
+                continue
+
+            self.buffer += chunk
+            while (idx := self.buffer.find(end)) >= 0:
+                message = bytes(memoryview(self.buffer)[:idx])
+                del self.buffer[:idx + len(end)]
                 try:
-                    char = self.serial_port.read()
-                    if char == self.message_end:
-                        message = self.buffer.decode()
-                        self.buffer = bytearray()
-                        try:
-                            data = json.loads(message)
-                            self._process_message(data)
-                        except json.JSONDecodeError:
-                            log.error(f'error message decode: {message}')
-                    else:
-                        self.buffer.extend(char)
-                except Exception as e:
-                    log.error(f'error read serial port: {e}')
-            time.sleep(0.01)
+                    data = _json_loads(message)
+                    self._process_message(data)
+                except ValueError:
+                    # JSONDecodeError (json, orjson) and UnicodeDecodeError both subclass
+                    # ValueError: log and skip the bad frame, the reader keeps running
+                    log.error('error message decode: %s', message)
             
     def _process_message(self, message: dict):
         """process message from VEX"""
         try:
-            msg_type = message.get('type', '').lower()
-            data = message.get('data', {})
-
-            if msg_type == 'check_service':
-                state = data.get('state')
-                log.info(f'{msg_type} status:\nstate: {state}')
-
-            elif msg_type == 'safety_service':
-                self.safety_status = message.get('data', {})
-                state = data.get('state')
-                time_taken = data.get('time')
-                log.info(f"{msg_type} status: \nstate: {state}, \ntime: {time_taken}s")
-                if state == 'error':
-                    log.error(f"Safety Service Error: {data.get('error_msg', 'Unknown error')}")
-
-            elif msg_type == 'scan_service':
-                state = data.get('state')
-                if state == 'detected':
-                    Thread(target=self._handle_object_detection, args=(data,)).start()
-                    log.info(f"Scan Data - Object Detected: "
-                            f"Angle:    {data['angle']}° "
-                            f"Distance: {data['distance']}mm")
-
-                elif state == 'complete':
-                    self.scan_complete_event.set()
-                    log.info("¡scan completed!")
-            
-            elif msg_type in ('pick_service', 'place_service'):
-                joint = data.get('joint')
-                self.movement_status[joint] = data
-                self.movement_event.set()
-                
-            elif msg_type == 'current_angles':
-                self.current_angles = message.get('data', {})
-                self.angles_event.set()
+            msg_type = message.get('type')
+            handler = self._handlers.get(msg_type)
+            if handler is None:
+                log.debug('unhandled message type: %s', msg_type)
+                return
+            # single lookup; also covers an explicit "data": null
+            handler(message.get('data') or {})
                 
         except Exception as e:
-            log.error(f'error process message: {e}')
+            log.error('error process message: %s', e)
+            
+    def _handle_check_service(self, data: dict):
+        state = data.get('state')
+        log.info('check_service status:\nstate: %s', state)
+        
+    def _handle_safety_service(self, data: dict):
+        self.safety_status = data
+        state = data.get('state')
+        time_taken = data.get('time')
+        log.info("safety_service status: \nstate: %s, \ntime: %ss", state, time_taken)
+        if state == 'error':
+            log.error("Safety Service Error: %s", data.get('error_msg', 'Unknown error'))
+            
+    def _handle_scan_service(self, data: dict):
+        state = data.get('state')
+        if state == 'detected':
+            try:
+                self._detection_queue.put_nowait(data)
+            except queue.Full:
+                log.warning("detection queue full, dropping detection")
+            log.info("Scan Data - Object Detected: Angle:    %s° Distance: %smm",
+                     data['angle'], data['distance'])
+
+        elif state == 'complete':
+            self.scan_complete_event.set()
+            log.info("¡scan completed!")
+            
+    def _handle_movement(self, data: dict):
+        joint = data.get('joint')
+        self.movement_status[joint] = data
+        self.movement_event.set()
+        
+    def _handle_current_angles(self, data: dict):
+        self.current_angles = data
+        self.angles_event.set()
+            
+    def _detection_worker(self):
+        """Thread loop that runs queued detections on the warm model"""
+        while not self._stop_event.is_set():
+            try:
+                data = self._detection_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._handle_object_detection(data)
             
     def _handle_object_detection(self, data: dict):
         """object detect in real time"""
         try:
-            # 1. capture image
-            img_path = self.camera.capture_image()
-            if not img_path:
+            # 1. capture image (kept in memory, saved only for the record)
+            frame = self.camera.capture_array()
+            if frame is None:
                 log.error("camera could not be captured")
                 return
+            img_path = self.camera.save_image(frame)
             
-            # 2. YOLO detection
-            image, yolo_result = self.object_detect_model.read_image_path(img_path, draw_results=True, save_drawn_img=True)
+            # 2. YOLO detection on the captured frame, no imread round trip
+            image, yolo_result = self.object_detect_model.read_image(frame, img_path, draw_results=True, save_drawn_img=True)
             if yolo_result is None:
                 log.info("no detections.")
                 return
             
             # 3. update data
-            data.update({
-                'class': yolo_result['class'],
-                'confidence': yolo_result['confidence'],
-                'timestamp': time.time(),
-                'image_path': img_path
-            })
+            data['class'] = yolo_result['class']
+            data['confidence'] = yolo_result['confidence']
+            data['timestamp'] = time.time()
+            data['image_path'] = img_path
             
             # 4. notify the central system
-            if self.callbacks.get('scan_service'):
-                self.callbacks['scan_service'](data)
+            callback = self.callbacks.get('scan_service')
+            if callback:
+                callback(data)
                 
         except Exception as e:
-            log.error(f"error in object detection: {str(e)}")
+            log.error("error in object detection: %s", e)
             
     def get_scan_data(self, timeout: float = 30.0) -> list:
         if self.scan_complete_event.wait(timeout):
@@ -209,27 +300,27 @@ class CommunicationManager:
     
     def wait_for_confirmation(self, joint:str, timeout: float = 30.0) -> bool:
         """wait for movement confirmed"""
-        start_time = time.time()
-        self.movement_event.clear()
+        deadline = time.monotonic() + timeout
         
-        while (time.time() - start_time) < timeout:
-            if self.movement_status.get(joint, {}).get('state') == 'completed':
+        while True:
+            # clear before checking so a status set meanwhile still wakes the wait
+            self.movement_event.clear()
+            state = self.movement_status.get(joint, {}).get('state')
+            if state == 'completed':
                 return True
-            if self.movement_status.get(joint, {}).get('state') == 'error':
+            if state == 'error':
                 log.error(f'error in movement')
                 return False
-            self.movement_event.wait(0.1)
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.movement_event.wait(remaining):
+                break
         
         log.warning(f"timeout, waiting movement of: {joint}")
         return False
     
     def wait_for_angles_response(self, timeout: float = 5.0) -> bool:
         self.angles_event.clear()
-        start_time = time.time()
-        
-        while (time.time() - start_time) < timeout:
-            if self.current_angles:
-                return True
-            self.angles_event.wait(0.1)
-            
-        return False
+        if self.current_angles:
+            return True
+        return self.angles_event.wait(timeout)
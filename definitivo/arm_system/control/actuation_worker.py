@@ -0,0 +1,153 @@
+"""
+Proceso de actuación del brazo robótico
+Es el dueño del PCA9685 y de los GPIO del stepper y recibe comandos por una
+cola, para que la percepción (OpenCV/YOLO) no compita por el GIL con las
+escrituras I2C y la temporización del stepper
+"""
+
+import os
+import multiprocessing
+import logging as log
+from queue import Empty
+from contextlib import contextmanager
+
+try:
+    from .robot_controller import ControladorRobotico
+except ImportError:
+    # Fallback for Windows testing
+    from control.robot_controller import ControladorRobotico
+
+# Núcleo reservado para la actuación (aislar con isolcpus=3 en cmdline.txt)
+NUCLEO_ACTUACION = 3
+PRIORIDAD_FIFO = 50
+# Comando cuyo argumento es una lista de (método, args) ejecutados en orden
+COMANDO_LOTE = 'lote'
+
+
+def _configurar_tiempo_real():
+    """Fijar núcleo, prioridad y planificador SCHED_FIFO (requiere root)"""
+    try:
+        os.sched_setaffinity(0, {NUCLEO_ACTUACION})
+    except (AttributeError, OSError) as e:
+        log.warning(f"No se pudo fijar el núcleo de actuación: {e}")
+    try:
+        os.nice(-10)
+    except (AttributeError, OSError) as e:
+        log.warning(f"No se pudo subir la prioridad de actuación: {e}")
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(PRIORIDAD_FIFO))
+    except (AttributeError, OSError) as e:
+        log.warning(f"No se pudo activar SCHED_FIFO: {e}")
+
+
+def run(cmd_q, status_q):
+    """Bucle del proceso de actuación: (método, args) -> (ok, error)"""
+    _configurar_tiempo_real()
+    try:
+        controlador = ControladorRobotico()
+    except Exception as e:
+        status_q.put((False, f"Error inicializando hardware: {e}"))
+        return
+    status_q.put((True, None))
+
+    try:
+        while True:
+            comando = cmd_q.get()
+            if comando is None:
+                break
+            metodo, args = comando
+            try:
+                if metodo == COMANDO_LOTE:
+                    for metodo_paso, args_paso in args[0]:
+                        getattr(controlador, metodo_paso)(*args_paso)
+                else:
+                    getattr(controlador, metodo)(*args)
+                status_q.put((True, None))
+            except Exception as e:
+                status_q.put((False, str(e)))
+    finally:
+        controlador.cerrar()
+
+
+class ActuationProcess:
+    """Interfaz de control del brazo que ejecuta cada movimiento en el proceso de actuación"""
+
+    def __init__(self):
+        ctx = multiprocessing.get_context('fork')
+        self.cmd_q = ctx.Queue()
+        self.status_q = ctx.Queue()
+        self.process = ctx.Process(target=run, args=(self.cmd_q, self.status_q), daemon=True)
+        self.process.start()
+        self._lote = None
+
+        ok, error = self._wait_status()
+        if not ok:
+            self.process.join(timeout=1.0)
+            raise RuntimeError(error)
+
+    def _wait_status(self):
+        """Esperar la respuesta del proceso; los movimientos del stepper pueden tardar"""
+        while True:
+            try:
+                return self.status_q.get(timeout=1.0)
+            except Empty:
+                if not self.process.is_alive():
+                    return False, "Proceso de actuación terminado"
+
+    def _execute(self, method, *args):
+        """Enviar un comando y esperar a que el proceso lo ejecute"""
+        if self._lote is not None:
+            self._lote.append((method, args))
+            return
+        self.cmd_q.put((method, args))
+        ok, error = self._wait_status()
+        if not ok:
+            raise RuntimeError(error)
+
+    @contextmanager
+    def batch(self):
+        """Agrupar los movimientos del bloque y enviarlos al proceso en un único comando
+
+        El proceso los ejecuta en orden y se detiene en el primero que falle
+        """
+        self._lote = []
+        try:
+            yield
+            lote, self._lote = self._lote, None
+            if lote:
+                self._execute(COMANDO_LOTE, lote)
+        finally:
+            self._lote = None
+
+    def move_base(self, angle, speed=5):
+        self._execute('mover_base', angle, speed)
+
+    def move_shoulder(self, angle, speed=5):
+        self._execute('mover_hombro', angle, speed)
+
+    def move_elbow(self, angle, speed=5):
+        self._execute('mover_codo', angle, speed)
+
+    def move_gripper(self, angle, speed=5):
+        self._execute('mover_pinza', angle, speed)
+
+    def move_joints(self, angles, speed=5):
+        self._execute('mover_articulaciones', angles, speed)
+
+    def move_arm(self, distance, direction=1, speed=1000):
+        self._execute('mover_brazo', distance, direction, speed)
+
+    def up_action(self, distance=50):
+        self._execute('accion_subir', distance)
+
+    def pick_action(self):
+        self._execute('accion_recoger')
+
+    def place_action(self):
+        self._execute('accion_soltar')
+
+    def close(self):
+        """Detener el proceso; libera el hardware al salir"""
+        if self.process.is_alive():
+            self.cmd_q.put(None)
+            self.process.join(timeout=5.0)
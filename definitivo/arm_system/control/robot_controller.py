@@ -1,19 +1,124 @@
+import os
+import glob
 import time
+import mmap
+import fcntl
+import ctypes
+import struct
+from array import array
+from functools import partial
 import board
 import busio
 from adafruit_pca9685 import PCA9685
 from gpiozero import OutputDevice
 import logging as log
 
+# Tramo final de cada espera que se resuelve con espera activa (time.sleep no es preciso)
+MARGEN_ESPERA_ACTIVA_NS = 200_000
+
+def _esperar_hasta(limite_ns):
+    """Esperar hasta un instante absoluto de time.monotonic_ns()"""
+    restante = limite_ns - time.monotonic_ns()
+    if restante > MARGEN_ESPERA_ACTIVA_NS:
+        time.sleep((restante - MARGEN_ESPERA_ACTIVA_NS) * 1e-9)
+    while time.monotonic_ns() < limite_ns:
+        pass
+
+# Registros GPSET0/GPCLR0 del bloque GPIO de los SoC BCM2835/2836/2837/2711
+REGISTRO_GPSET0 = 0x1C
+REGISTRO_GPCLR0 = 0x28
+SOC_CON_GPIOMEM = (b'brcm,bcm2835', b'brcm,bcm2836', b'brcm,bcm2837', b'brcm,bcm2711')
+
+def _mapear_gpiomem():
+    """Mapear los registros GPIO desde /dev/gpiomem
+
+    Devuelve None si el SoC no usa el bloque GPIO del BCM2835 (la Pi 5 lleva
+    los GPIO en el RP1) o si el dispositivo no está disponible
+    """
+    try:
+        with open('/proc/device-tree/compatible', 'rb') as f:
+            compatibles = f.read().split(b'\0')
+    except OSError:
+        return None
+    if not any(c in SOC_CON_GPIOMEM for c in compatibles):
+        return None
+
+    try:
+        fd = os.open('/dev/gpiomem', os.O_RDWR | os.O_SYNC)
+    except OSError as e:
+        log.warning(f"No se pudo abrir /dev/gpiomem, se usa gpiozero: {e}")
+        return None
+    try:
+        return mmap.mmap(fd, 4096)
+    finally:
+        os.close(fd)
+
+# ioctl de la ABI v2 de GPIO por dispositivo de caracteres (linux/gpio.h)
+GPIO_GET_CHIPINFO_IOCTL = 0x8044B401
+GPIO_V2_GET_LINE_IOCTL = 0xC250B407
+GPIO_V2_LINE_SET_VALUES_IOCTL = 0xC010B40F
+GPIO_V2_LINE_FLAG_OUTPUT = 1 << 3
+# struct gpio_v2_line_request: offsets, consumer, config (flags, num_attrs, attrs), num_lines, ..., fd
+FORMATO_SOLICITUD_LINEA = '<64I32sQI5I240xII5Ii'
+# Controladores GPIO del conector de 40 pines (Pi 5 y Pi 1-4)
+CHIPS_GPIO_CONECTOR = (b'pinctrl-rp1', b'pinctrl-bcm2711', b'pinctrl-bcm2835')
+# struct gpio_v2_line_values con bits/mask de una sola línea
+VALOR_LINEA_ALTO = struct.pack('<QQ', 1, 1)
+VALOR_LINEA_BAJO = struct.pack('<QQ', 0, 1)
+
+def _solicitar_linea_salida(linea, consumidor=b'brazo-stepper'):
+    """Pedir una línea GPIO como salida al chip del conector
+
+    Devuelve el fd de la línea, sobre el que cada flanco es un único ioctl
+    GPIO_V2_LINE_SET_VALUES, o None si no hay GPIO por /dev/gpiochip*
+    """
+    for ruta in sorted(glob.glob('/dev/gpiochip*')):
+        try:
+            fd_chip = os.open(ruta, os.O_RDWR | os.O_CLOEXEC)
+        except OSError:
+            continue
+        try:
+            info = bytearray(68)
+            fcntl.ioctl(fd_chip, GPIO_GET_CHIPINFO_IOCTL, info)
+            etiqueta = bytes(info[32:64]).rstrip(b'\0')
+            if etiqueta not in CHIPS_GPIO_CONECTOR:
+                continue
+
+            solicitud = bytearray(struct.pack(
+                FORMATO_SOLICITUD_LINEA, linea, *([0] * 63), consumidor,
+                GPIO_V2_LINE_FLAG_OUTPUT, 0, 0, 0, 0, 0, 0,
+                1, 0, 0, 0, 0, 0, 0, 0))
+            fcntl.ioctl(fd_chip, GPIO_V2_GET_LINE_IOCTL, solicitud)
+            return struct.unpack_from('<i', solicitud, struct.calcsize(FORMATO_SOLICITUD_LINEA) - 4)[0]
+        except OSError as e:
+            log.warning(f"No se pudo pedir la línea {linea} en {ruta}: {e}")
+        finally:
+            os.close(fd_chip)
+    return None
+
+# Reloj del bus I2C en Hz (el PCA9685 admite hasta 1 MHz)
+FRECUENCIA_BUS_I2C = 400_000
+
+# Registro LED0_ON_L del PCA9685; cada canal ocupa 4 registros (ON_L, ON_H, OFF_L, OFF_H)
+REGISTRO_LED0_ON_L = 0x06
+
 class ControladorServo:
     """Controlador para servos continuos usando PCA9685"""
 
-    def __init__(self, direccion_i2c=0x40, frecuencia=50):
-        """Inicializar controlador PCA9685"""
-        self.i2c = busio.I2C(board.SCL, board.SDA)
+    def __init__(self, i2c=None, direccion_i2c=0x40, frecuencia=50, frecuencia_bus=FRECUENCIA_BUS_I2C):
+        """Inicializar controlador PCA9685
+
+        i2c: bus compartido; si no se indica se crea uno propio
+        frecuencia_bus: reloj I2C en Hz (el PCA9685 admite hasta 1 MHz). En la
+        Raspberry Pi el bus hardware usa el valor de /boot/config.txt, p. ej.
+        dtparam=i2c_arm_baudrate=1000000
+        """
+        self.i2c = i2c or busio.I2C(board.SCL, board.SDA, frequency=frecuencia_bus)
         self.pca = PCA9685(self.i2c, address=direccion_i2c)
         self.pca.frequency = frecuencia
         self.servos = {}
+        # Copia en software del último ciclo escrito en cada canal
+        self._ultimo_ciclo = [None] * 16
 
     def agregar_servo(self, nombre, canal, pulso_min=500, pulso_max=2500, angulo_min=0, angulo_max=180):
         """Agregar servo al controlador"""
@@ -23,18 +128,19 @@ class ControladorServo:
             'pulso_min': pulso_min,
             'pulso_max': pulso_max,
             'angulo_min': angulo_min,
-            'angulo_max': angulo_max
+            'angulo_max': angulo_max,
+            # Tabla ángulo entero -> ciclo de trabajo, calculada una sola vez
+            'ciclos': array('H', (self._calcular_ciclo(a) for a in range(int(angulo_min), int(angulo_max) + 1)))
         }
 
-    def establecer_angulo(self, nombre, angulo, velocidad=1.0):
-        """Establecer velocidad del servo continuo"""
-        if nombre not in self.servos:
-            log.error(f"Servo {nombre} no configurado")
-            return
-
-        servo = self.servos[nombre]
+    def _ciclo_trabajo(self, servo, angulo):
+        """Ciclo de trabajo de 16 bits para un ángulo, leído de la tabla del servo"""
         angulo = max(servo['angulo_min'], min(servo['angulo_max'], angulo))
+        return servo['ciclos'][int(angulo) - int(servo['angulo_min'])]
 
+    @staticmethod
+    def _calcular_ciclo(angulo):
+        """Calcular el ciclo de trabajo de 16 bits para un ángulo"""
         # CONTROL DE SERVOS CONTINUOS - Control de velocidad, no posición
         # Mapear ángulo a velocidad: 180° = parar, <180° = giro horario, >180° = giro antihorario
         if angulo == 180:
@@ -49,22 +155,102 @@ class ControladorServo:
             factor_velocidad = (angulo - 180) / 180.0  # 0 a 1
             pulso = 1500 - (500 * factor_velocidad)  # 1500-1000us
 
-        ciclo_trabajo = int(pulso / 20000 * 0xFFFF)  # Periodo 50Hz
-        self.pca.channels[servo['canal']].duty_cycle = ciclo_trabajo
+        return int(pulso / 20000 * 0xFFFF)  # Periodo 50Hz
+
+    def establecer_angulo(self, nombre, angulo, velocidad=1.0):
+        """Establecer velocidad del servo continuo"""
+        if nombre not in self.servos:
+            log.error(f"Servo {nombre} no configurado")
+            return
+
+        servo = self.servos[nombre]
+        ciclo_trabajo = self._ciclo_trabajo(servo, angulo)
+        canal = servo['canal']
+        if self._ultimo_ciclo[canal] == ciclo_trabajo:
+            return  # El registro ya tiene este valor
+        self.pca.channels[canal].duty_cycle = ciclo_trabajo
+        self._ultimo_ciclo[canal] = ciclo_trabajo
 
         # Retardo mínimo para control responsivo
         time.sleep(0.02 / velocidad)
 
+    def establecer_angulos(self, angulos, velocidad=1.0):
+        """Establecer varios servos a la vez con una escritura I2C por bloque de canales consecutivos"""
+        ciclos = {}
+        for nombre, angulo in angulos.items():
+            if nombre not in self.servos:
+                log.error(f"Servo {nombre} no configurado")
+                continue
+            servo = self.servos[nombre]
+            ciclo_trabajo = self._ciclo_trabajo(servo, angulo)
+            if self._ultimo_ciclo[servo['canal']] != ciclo_trabajo:
+                ciclos[servo['canal']] = ciclo_trabajo
+
+        if not ciclos:
+            return  # Ningún canal cambia
+
+        canales = sorted(ciclos)
+        inicio = 0
+        while inicio < len(canales):
+            # Extender el bloque mientras los canales sean consecutivos
+            fin = inicio + 1
+            while fin < len(canales) and canales[fin] == canales[fin - 1] + 1:
+                fin += 1
+
+            # El PCA9685 autoincrementa el registro (MODE1.AI, activado por adafruit_pca9685)
+            buf = bytearray([REGISTRO_LED0_ON_L + 4 * canales[inicio]])
+            for canal in canales[inicio:fin]:
+                buf += self._registros_canal(ciclos[canal])
+            with self.pca.i2c_device as i2c:
+                i2c.write(buf)
+            for canal in canales[inicio:fin]:
+                self._ultimo_ciclo[canal] = ciclos[canal]
+            inicio = fin
+
+        # Un solo retardo para todo el bloque de servos
+        time.sleep(0.02 / velocidad)
+
+    @staticmethod
+    def _registros_canal(ciclo_trabajo):
+        """Valores ON/OFF de 12 bits de un canal, igual que PWMChannel.duty_cycle"""
+        if ciclo_trabajo == 0xFFFF:
+            return struct.pack('<HH', 0x1000, 0)  # Siempre encendido
+        return struct.pack('<HH', 0, (ciclo_trabajo + 1) >> 4)
+
 class ControladorStepper:
     """Controlador para motores stepper"""
 
     def __init__(self, pin_paso, pin_direccion, pin_habilitar=None, pasos_por_rev=200, micropasos=16):
         """Inicializar controlador stepper"""
-        self.pin_paso = OutputDevice(pin_paso)
         self.pin_direccion = OutputDevice(pin_direccion)
         self.pin_habilitar = OutputDevice(pin_habilitar) if pin_habilitar else None
         self.pasos_por_rev = pasos_por_rev * micropasos
         self.posicion_actual = 0
+        self._ultima_direccion = None
+
+        # Backend del pin de paso, del más rápido al más portable:
+        # registros GPSET0/GPCLR0, línea GPIO por /dev/gpiochip o gpiozero
+        self.pin_paso = None
+        self._linea_paso = None
+        self._gpio = _mapear_gpiomem()
+        if self._gpio is None:
+            self._linea_paso = _solicitar_linea_salida(pin_paso)
+
+        if self._gpio is not None:
+            # gpiozero deja el pin configurado como salida
+            self.pin_paso = OutputDevice(pin_paso)
+            mascara = 1 << pin_paso
+            gpset = (ctypes.c_uint32 * 1).from_buffer(self._gpio, REGISTRO_GPSET0)
+            gpclr = (ctypes.c_uint32 * 1).from_buffer(self._gpio, REGISTRO_GPCLR0)
+            self._encender_paso = partial(gpset.__setitem__, 0, mascara)
+            self._apagar_paso = partial(gpclr.__setitem__, 0, mascara)
+        elif self._linea_paso is not None:
+            self._encender_paso = partial(fcntl.ioctl, self._linea_paso, GPIO_V2_LINE_SET_VALUES_IOCTL, VALOR_LINEA_ALTO)
+            self._apagar_paso = partial(fcntl.ioctl, self._linea_paso, GPIO_V2_LINE_SET_VALUES_IOCTL, VALOR_LINEA_BAJO)
+        else:
+            self.pin_paso = OutputDevice(pin_paso)
+            self._encender_paso = self.pin_paso.on
+            self._apagar_paso = self.pin_paso.off
 
     def habilitar(self):
         """Habilitar motor stepper"""
@@ -76,15 +262,35 @@ class ControladorStepper:
         if self.pin_habilitar:
             self.pin_habilitar.on()
 
+    def cerrar(self):
+        """Liberar la línea GPIO del pin de paso"""
+        if self._linea_paso is not None:
+            os.close(self._linea_paso)
+            self._linea_paso = None
+
     def mover_pasos(self, pasos, direccion=1, velocidad=1000):  # pasos por segundo
         """Mover stepper una cantidad específica de pasos"""
-        self.pin_direccion.value = 1 if direccion > 0 else 0
-        retardo = 1.0 / velocidad
+        valor_direccion = 1 if direccion > 0 else 0
+        if self._ultima_direccion != valor_direccion:
+            self.pin_direccion.value = valor_direccion
+            self._ultima_direccion = valor_direccion
+        medio_periodo_ns = int(5e8 / velocidad)
+
+        # Resolver métodos una sola vez: el bucle corre una vez por flanco
+        encender = self._encender_paso
+        apagar = self._apagar_paso
+        esperar_hasta = _esperar_hasta
+
+        # Plazos absolutos: el tiempo de Python de cada flanco se descuenta de la
+        # espera y un flanco atrasado no retrasa a los siguientes
+        limite = time.monotonic_ns()
         for _ in range(abs(pasos)):
-            self.pin_paso.on()
-            time.sleep(retardo / 2)
-            self.pin_paso.off()
-            time.sleep(retardo / 2)
+            encender()
+            limite += medio_periodo_ns
+            esperar_hasta(limite)
+            apagar()
+            limite += medio_periodo_ns
+            esperar_hasta(limite)
         self.posicion_actual += pasos * direccion
 
     def mover_distancia(self, distancia_mm, paso_tuerca=8, direccion=1, velocidad=1000):
@@ -97,7 +303,9 @@ class ControladorRobotico:
 
     def __init__(self):
         """Inicializar controlador del robot"""
-        self.controlador_servo = ControladorServo()
+        # Un único bus I2C para todos los dispositivos del brazo
+        self.i2c = busio.I2C(board.SCL, board.SDA, frequency=FRECUENCIA_BUS_I2C)
+        self.controlador_servo = ControladorServo(self.i2c)
         # Configurar servos: base (canal 0), hombro (1), codo (2), pinza (3)
         # Todos los servos son continuos de 360°
         self.controlador_servo.agregar_servo('base', 0, angulo_min=0, angulo_max=360)
@@ -124,6 +332,10 @@ class ControladorRobotico:
         """Mover pinza del robot"""
         self.controlador_servo.establecer_angulo('gripper', angulo, velocidad)
 
+    def mover_articulaciones(self, angulos, velocidad=5):
+        """Mover varios servos en la misma transacción I2C"""
+        self.controlador_servo.establecer_angulos(angulos, velocidad)
+
     def mover_brazo(self, distancia_mm, direccion=1, velocidad=1000):
         """Mover brazo stepper una distancia específica"""
         self.controlador_stepper.mover_distancia(distancia_mm, direccion=direccion, velocidad=velocidad)
@@ -143,4 +355,6 @@ class ControladorRobotico:
     def cerrar(self):
         """Cerrar controladores y liberar recursos"""
         self.controlador_stepper.deshabilitar()
+        self.controlador_stepper.cerrar()
         self.controlador_servo.pca.deinit()
+        self.i2c.deinit()
@@ -1,15 +1,69 @@
+import re
 import time
+import queue
+import threading
 import logging as log
-from control.robot_controller import RobotController
+import numpy as np
+from types import MappingProxyType
+from dataclasses import dataclass
+from functools import cached_property, partial
+from concurrent.futures import ThreadPoolExecutor
+from control.actuation_worker import ActuationProcess
 from communication.serial_manager import CommunicationManager
 
 log.basicConfig(level=log.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# joints driven by the PCA9685 servo board
+SERVO_JOINTS = ('base', 'shoulder', 'elbow', 'gripper')
+
+# manual command: joint/arm letter followed by an angle or distance (b90, a-50)
+MANUAL_CMD_RE = re.compile(r'^([bsega])(-?\d+)$')
+
+# a prefetched scan older than this (seconds) no longer describes the table
+PREFETCH_MAX_AGE = 5.0
+
+
+@dataclass(slots=True, frozen=True)
+class Zone:
+    """placement zone for a class of object"""
+    angle: float
+    distance: float
+
+
+@dataclass(slots=True)
+class ScanResult:
+    """one detected object, as listed in the selection menu"""
+    index: int
+    center_angle: float
+    distance: float
+    object_class: str
+    confidence: float
+    placement_zone: Zone
+    image: str
+
 
 class Robot:
-    def __init__(self):
+    def __init__(self, scan_frames: int = 1, scan_min_confidence: float = 0.55, scan_classes: tuple = None):
         
-        self.robot_controller = RobotController()
+        # servos/stepper run in a separate process, off the perception thread
+        self.robot_controller = ActuationProcess()
+        # manual command letter -> (joint, move function)
+        self._manual_joints = {
+            'b': ('base', self.robot_controller.move_base),
+            's': ('shoulder', self.robot_controller.move_shoulder),
+            'e': ('elbow', self.robot_controller.move_elbow),
+            'g': ('gripper', self.robot_controller.move_gripper),
+        }
+        # (joint, action) -> handler(move, lines), resolved once instead of branching per move
+        self._move_dispatch = {
+            ('base', None): self._move_base,
+            ('arm', None): self._move_arm,
+            ('arm', 'pick'): partial(self._lower_arm, purpose='recoger'),
+            ('arm', 'place'): partial(self._lower_arm, purpose='colocar'),
+            ('arm', 'up'): self._raise_arm,
+            ('gripper', 'close'): partial(self._gripper_action, 'cerrando', self.robot_controller.place_action),
+            ('gripper', 'open'): partial(self._gripper_action, 'abriendo', self.robot_controller.pick_action),
+        }
         self.serial_manager = None  # Inicializar como None
 
         # Intentar inicializar la conexión serial (opcional)
@@ -24,14 +78,158 @@ class Robot:
 
         # register scan data
         self.scan_results = []
+        self.scan_results_by_index = {}
+        # frames captured per scan, detected in one batched inference
+        self.scan_frames = scan_frames
+        # detections below this confidence or outside scan_classes (None = all) are not registered
+        self.scan_min_confidence = scan_min_confidence
+        self.scan_classes = scan_classes
+
+        # frames handed from the camera thread to the scan
+        self._frame_q = queue.Queue(maxsize=2)
+        self._scan_active = threading.Event()
+        self._camera_thread = None
+        # captures + inference run on one worker; after a scan the next one is
+        # prefetched there while the user picks an object, as (future, cancel event)
+        self._scan_worker = ThreadPoolExecutor(max_workers=1)
+        self._next_scan = None
+
+        # zones (read-only; the default is resolved once)
+        self.placement_zones = MappingProxyType({
+            'apple': Zone(angle=90, distance=200),
+            'orange': Zone(angle=180, distance=200),
+            'bottle': Zone(angle=45, distance=200),
+            'default': Zone(angle=270, distance=200),
+        })
+        self._default_zone = self.placement_zones['default']
+
+        # load camera and model in the background (after the actuation fork) so the
+        # menu is available at once and the first scan is not slow
+        warmup_pool = ThreadPoolExecutor(max_workers=1)
+        self._vision_warmup = warmup_pool.submit(self._preload_vision)
+        warmup_pool.shutdown(wait=False)
+
+    def _preload_vision(self):
+        """import and initialise the vision stack (cv2, torch, ultralytics)"""
+        try:
+            self.camera
+            self.detector
+        except Exception as e:
+            log.warning(f"Error inicializando componentes de visión: {e}")
+
+    @cached_property
+    def camera(self):
+        """camera, opened once on first use; shared with the serial detections so
+        only one handle streams from the device"""
+        if self.serial_manager is not None:
+            return self.serial_manager.camera
+        from perception.vision.camera.main import CameraManager
+        return CameraManager()
 
-        # zones
-        self.placement_zones = {
-            'apple': {'angle': 90, 'distance': 200},
-            'orange': {'angle': 180, 'distance': 200},
-            'bottle': {'angle': 45, 'distance': 200},
-            'default': {'angle': 270, 'distance': 200},
-        }
+    @cached_property
+    def detector(self):
+        """detection model, shared with the serial detections and warmed up by the loader"""
+        from perception.vision.detection.main import DetectionModel
+        return DetectionModel()
+
+    def _camera_producer(self):
+        """capture frames while a scan is active"""
+        while True:
+            self._scan_active.wait()
+            # raw frames only: the scan saves the one it registers
+            try:
+                image = self.camera.capture_array()
+            except Exception as e:
+                log.warning(f"Error capturando imagen: {e}")
+                image = None
+
+            try:
+                self._frame_q.put(image, timeout=1.0)
+            except queue.Full:
+                pass
+
+    def _capture_frames(self, count: int, cancel: threading.Event = None) -> list:
+        """get up to count frames captured during this scan from the camera thread;
+        stops early once cancel is set"""
+        if self._camera_thread is None:
+            self._camera_thread = threading.Thread(target=self._camera_producer, daemon=True)
+            self._camera_thread.start()
+
+        # drop frames left over from a previous scan
+        while True:
+            try:
+                self._frame_q.get_nowait()
+            except queue.Empty:
+                break
+
+        frames = []
+        deadline = time.monotonic() + 10.0
+        self._scan_active.set()
+        try:
+            # short waits so a cancel stops the capture before the arm moves
+            while len(frames) < count and not (cancel is not None and cancel.is_set()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    image = self._frame_q.get(timeout=min(remaining, 0.1))
+                except queue.Empty:
+                    continue
+                if image is None:
+                    break
+                frames.append(image)
+        finally:
+            self._scan_active.clear()
+        return frames
+
+    def _capture_and_infer(self, detector, cancel: threading.Event = None) -> tuple:
+        """capture the scan frames and detect objects in them: (captured_at, frames, results)"""
+        frames = self._capture_frames(self.scan_frames, cancel)
+        captured_at = time.monotonic()
+        if not frames or (cancel is not None and cancel.is_set()):
+            return captured_at, [], []
+        return captured_at, frames, self._detect_frames(detector, frames)
+
+    def _prefetch_scan(self, detector):
+        """start capturing the next scan in the background"""
+        cancel = threading.Event()
+        self._next_scan = (self._scan_worker.submit(self._capture_and_infer, detector, cancel), cancel)
+
+    def _take_prefetched_scan(self) -> tuple:
+        """frames and results prefetched after the last scan, or (None, None) if none is fresh"""
+        prefetch, self._next_scan = self._next_scan, None
+        if prefetch is None:
+            return None, None
+        try:
+            captured_at, frames, results = prefetch[0].result()
+        except Exception as e:
+            log.warning(f"prefetched scan failed: {e}")
+            return None, None
+        if not frames or time.monotonic() - captured_at > PREFETCH_MAX_AGE:
+            return None, None
+        return frames, results
+
+    def _discard_prefetched_scan(self):
+        """the arm is about to move: the prefetched frames would no longer match the scene"""
+        if self._next_scan is not None:
+            future, cancel = self._next_scan
+            # cancel() only helps while queued; the event stops a capture already running
+            cancel.set()
+            future.cancel()
+            self._next_scan = None
+
+    def _detect_frames(self, detector, images: list) -> list:
+        """run one batched inference, halving the batch if the device runs out of memory"""
+        while True:
+            try:
+                results, _ = detector.inference(images if len(images) > 1 else images[0])
+                return list(results)
+            except RuntimeError as e:
+                if 'out of memory' not in str(e) or len(images) == 1:
+                    raise
+                self.scan_frames = len(images) // 2
+                log.warning(f"out of memory in batch inference - scan_frames reduced to {self.scan_frames}")
+                images = images[:self.scan_frames]
         
     # --- MENU ---
     def main_menu_loop(self):
@@ -49,12 +247,14 @@ class Robot:
 
             if user_input == 'c':
                 if self.serial_manager:
+                    self._discard_prefetched_scan()
                     self.serial_manager.send_message('check_service', {})
                 else:
                     log.info("Modo sin hardware - check service simulado")
 
             elif user_input == 's':
                 if self.serial_manager:
+                    self._discard_prefetched_scan()
                     self.serial_manager.send_message('safety_service', {})
                 else:
                     log.info("Modo sin hardware - safety service simulado")
@@ -73,62 +273,80 @@ class Robot:
 
             else:
                 print("command unrecognized")
-
-            time.sleep(0.5)
             
     # --- SCAN ---
     def handle_scan_command(self):
         """scan command"""
 
-        from perception.vision.camera.main import CameraManager
-        from perception.vision.detection.main import DetectionModel
-
         self.scan_results = []
+        self.scan_results_by_index = {}
 
+        # blocks only if the scan is requested before the warmup finished
+        self._vision_warmup.result()
         try:
-            camera = CameraManager()
-            detector = DetectionModel()
+            self.camera
+            detector = self.detector
         except Exception as e:
             log.error(f"Error inicializando componentes de visión: {e}")
             # Simular detección para modo demo
             self._simulate_detection()
             return
 
-        log.info("scanning in progress...")
-
-        # Capture image
-        try:
-            image_path = camera.capture_image()
-            if not image_path:
-                log.warning("failed to capture image - usando modo simulado")
-                self._simulate_detection()
-                return
-        except Exception as e:
-            log.warning(f"Error capturando imagen: {e} - usando modo simulado")
+        frames, results = self._take_prefetched_scan()
+        if frames is None:
+            log.info("scanning in progress...")
+            # Capture images (camera thread) and detect objects in every frame
+            # with one batched forward pass
+            _, frames, results = self._scan_worker.submit(self._capture_and_infer, detector).result()
+        else:
+            log.info("scanning in progress... (prefetched)")
+        if not frames:
+            log.warning("failed to capture image - usando modo simulado")
             self._simulate_detection()
             return
 
-        # Load image
-        import cv2
-        image = cv2.imread(image_path)
+        names = detector.class_names
+        allowed_ids = None
+        if self.scan_classes is not None:
+            allowed_ids = np.array([i for i, name in names.items() if name in self.scan_classes])
 
-        # Detect objects
-        results, names = detector.inference(image)
-
-        for result in results:
+        best = None
+        for image, result in zip(frames, results):
             boxes = result.boxes
-            for box in boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                xyxy = box.xyxy[0].cpu().numpy()
-                x1, y1, x2, y2 = xyxy
-                center_x = (x1 + x2) / 2
-                center_y = (y1 + y2) / 2
-
-                # Simulate angle and distance based on position
-                angle = (center_x / image.shape[1]) * 180  # rough estimate
-                distance = 200  # fixed for now
-
+            if not len(boxes):
+                continue
+
+            # a single device->host copy: rows are x1, y1, x2, y2, conf, cls
+            rows = boxes.data.cpu().numpy()
+
+            # filter every box at once before any per-object work
+            keep = rows[:, 4] >= self.scan_min_confidence
+            if allowed_ids is not None:
+                keep &= np.isin(rows[:, 5].astype(np.int32), allowed_ids)
+            rows = rows[keep]
+            if not len(rows):
+                continue
+
+            xyxy = rows[:, :4]
+            confidences = rows[:, 4]
+            classes = rows[:, 5].astype(np.int32)
+
+            # frames see the same objects: keep the most confident one
+            if best is None or confidences.sum() > best[3].sum():
+                best = (image, xyxy, classes, confidences)
+
+        if best is not None:
+            image, xyxy, classes, confidences = best
+            image_width = image.shape[1]
+            # only the frame whose objects are registered is written to disk
+            image_path = self.camera.save_image(image)
+
+            # Simulate angle and distance based on position
+            centers_x = (xyxy[:, 0] + xyxy[:, 2]) * 0.5
+            angles = centers_x * (180.0 / image_width)  # rough estimate
+            distance = 200  # fixed for now
+
+            for cls, conf, angle in zip(classes.tolist(), confidences.tolist(), angles.tolist()):
                 data = {
                     'class': names[cls],
                     'confidence': conf,
@@ -139,6 +357,9 @@ class Robot:
                 self._scan_callback(data)
 
         self.process_scan_results()
+
+        # the arm has not moved yet: take the next scan while the user reads the list
+        self._prefetch_scan(detector)
         
     def _scan_callback(self, data):
         if data.get('class'):
@@ -147,24 +368,24 @@ class Robot:
     def _update_object_registry(self, data: dict):
         """update object registry"""
         try:
-            self.scan_results.append({
-                'position': {
-                    'angle': data.get('angle', 0),
-                    'distance': data.get('distance', 0)
-                },
-                'detection':{
-                    'class': data.get('class', 'default'),
-                    'confidence': data.get('confidence', 0.0),
-                    'image': data.get('image_path', '')
-                },
-                'placement_zone': self._get_placement_zones(data.get('class', 'default'))
-            })
+            object_class = data.get('class', 'default')
+            record = ScanResult(
+                index=len(self.scan_results) + 1,
+                center_angle=data.get('angle', 0),
+                distance=data.get('distance', 0),
+                object_class=object_class,
+                confidence=data.get('confidence', 0.0),
+                placement_zone=self._get_placement_zones(object_class),
+                image=data.get('image_path', '')
+            )
+            self.scan_results.append(record)
+            self.scan_results_by_index[record.index] = record
         except Exception as e:
             log.error(f"error updating registry: {str(e)}")
         
-    def _get_placement_zones(self, object_class: str):
-        return self.placement_zones.get(object_class.lower(), 
-                                        self.placement_zones['default'])          
+    def _get_placement_zones(self, object_class: str) -> Zone:
+        # class names arrive lowercase from the detector
+        return self.placement_zones.get(object_class, self._default_zone)          
         
     def process_scan_results(self):
         """process scan data"""
@@ -172,31 +393,16 @@ class Robot:
             log.warning("scanning completed without object detection")
             return
             
-        log.info(f"\n=== objects scanned: ({len(self.scan_results)}) ===")
-        processed_list = []
-        for i, obj in enumerate(self.scan_results, start=1):
-            angle = obj['position']['angle']
-            distance = obj['position']['distance']
-            obj_class = obj['detection']['class']
-            confidence = obj['detection']['confidence']
-            zone = obj['placement_zone']
-
-            item = {
-                'index': i,
-                'center_angle': angle,
-                'distance': distance,
-                'class': obj_class,
-                'confidence': confidence,
-                'placement_zone': zone
-            }
-            processed_list.append(item)
-
-            log.info(f"Obj {i} -> angle: {angle}°, distance: {distance}mm, class: {obj_class}, conf: {confidence:.2f}")
-
-        self.scan_results = processed_list
+        # one log record for the whole list instead of one per object
+        if log.getLogger().isEnabledFor(log.INFO):
+            lines = [f"\n=== objects scanned: ({len(self.scan_results)}) ==="]
+            lines += [f"Obj {obj.index} -> angle: {obj.center_angle}°, distance: {obj.distance}mm, class: {obj.object_class}, conf: {obj.confidence:.2f}"
+                      for obj in self.scan_results]
+            log.info("\n".join(lines))
 
     def manual_control_menu(self):
         """Menú de control manual del brazo"""
+        self._discard_prefetched_scan()
         print("\n=== MANUAL CONTROL ===")
         print("Controles:")
         print(" [b<angle>] base angle (ej: b90)")
@@ -220,45 +426,30 @@ class Robot:
 
     def parse_manual_command(self, cmd):
         """Parse manual command like 'b90' or 'a-50'"""
-        try:
-            if cmd[0] in ['b', 's', 'e', 'g']:
-                # Servo control
-                joint_map = {'b': 'base', 's': 'shoulder', 'e': 'elbow', 'g': 'gripper'}
-                joint = joint_map[cmd[0]]
-                angle = int(cmd[1:])
-
-                log.info(f"Moviendo {joint} a {angle}°")
-                if joint == 'base':
-                    self.robot_controller.move_base(angle, speed=10)  # slower for manual
-                elif joint == 'shoulder':
-                    self.robot_controller.move_shoulder(angle, speed=10)
-                elif joint == 'elbow':
-                    self.robot_controller.move_elbow(angle, speed=10)
-                elif joint == 'gripper':
-                    self.robot_controller.move_gripper(angle, speed=10)
-
-            elif cmd.startswith('a'):
-                # Arm control
-                distance = int(cmd[1:])
-                direction = 1 if distance > 0 else -1
-                distance = abs(distance)
-
-                log.info(f"Moviendo brazo {'arriba' if direction > 0 else 'abajo'} {distance}mm")
-                self.robot_controller.move_arm(distance, direction=direction, speed=500)  # slower
-
-        except ValueError:
+        match = MANUAL_CMD_RE.match(cmd)
+        if not match:
             print("Formato inválido. Use números después de la letra.")
+            return
+
+        letter, value = match.group(1), int(match.group(2))
+        if letter == 'a':
+            # Arm control
+            direction = 1 if value > 0 else -1
+            distance = abs(value)
+
+            log.info(f"Moviendo brazo {'arriba' if direction > 0 else 'abajo'} {distance}mm")
+            self.robot_controller.move_arm(distance, direction=direction, speed=500)  # slower
+        else:
+            # Servo control
+            joint, move = self._manual_joints[letter]
+            log.info(f"Moviendo {joint} a {value}°")
+            move(value, speed=10)  # slower for manual
 
     def move_to_home(self):
         """Move to home position"""
         log.info("Moviendo a posición home...")
-        self.robot_controller.move_base(90, speed=5)
-        time.sleep(0.5)
-        self.robot_controller.move_shoulder(90, speed=5)
-        time.sleep(0.5)
-        self.robot_controller.move_elbow(90, speed=5)
-        time.sleep(0.5)
-        self.robot_controller.move_gripper(0, speed=5)  # open
+        # all joints start together in one I2C burst (gripper 0 = open)
+        self.robot_controller.move_joints({'base': 90, 'shoulder': 90, 'elbow': 90, 'gripper': 0}, speed=5)
         log.info("Posición home alcanzada")
 
     def _simulate_detection(self):
@@ -299,9 +490,9 @@ class Robot:
         if not selected_object:
             return
 
-        log.info(f"\ninit pick & place to object: {selected_object['index']}:")
-        log.info(f"angle: {selected_object['center_angle']}°")
-        log.info(f"distance: {selected_object['distance']} mm")
+        log.info(f"\ninit pick & place to object: {selected_object.index}:")
+        log.info(f"angle: {selected_object.center_angle}°")
+        log.info(f"distance: {selected_object.distance} mm")
         
         if self.execute_pick_sequence(selected_object):
             log.info(f"¡pick completed!")
@@ -312,29 +503,28 @@ class Robot:
         """interface for object selection"""
         print("\n=== OBJECTS DETECTED LIST ===")
         for o in self.scan_results:
-            i = o['index']
-            print(f"[{i}] angle={o['center_angle']}° dist={o['distance']}mm class={o['class']} conf={o['confidence']:.2f}")
+            print(f"[{o.index}] angle={o.center_angle}° dist={o.distance}mm class={o.object_class} conf={o.confidence:.2f}")
         print("[0] cancelar")
         
         try:
             selection = int(input("\nselect the object you want to take: "))
             if selection == 0:
                 print("operation canceled")
-                return {}
+                return None
             
-            return next((x for x in self.scan_results if x['index'] == selection), {})
+            return self.scan_results_by_index.get(selection)
         
         except ValueError:
             print("invalid input")
-            return {}
+            return None
         
-    def execute_pick_sequence(self, target_object: dict) -> bool:
+    def execute_pick_sequence(self, target_object: ScanResult) -> bool:
         try:
             plan = [
-                {'joint': 'base', 'angle': target_object['center_angle'], 'speed': 30},
-                {'joint': 'arm', 'distance': target_object['distance'], 'action': 'pick'},
+                {'joint': 'base', 'angle': target_object.center_angle, 'speed': 30},
+                {'joint': 'arm', 'distance': target_object.distance, 'action': 'pick'},
                 {'joint': 'gripper', 'action': 'close'},
-                {'joint': 'arm', 'distance': target_object['distance'], 'action': 'up'},
+                {'joint': 'arm', 'distance': target_object.distance, 'action': 'up'},
             ]
             self.execute_movement('pick_service', plan)
             return True
@@ -342,15 +532,15 @@ class Robot:
             log.error(f"Error in pick sequence: {e}")
             return False
         
-    def execute_place_sequence(self, target_object: dict):
+    def execute_place_sequence(self, target_object: ScanResult):
         """execute object in place"""
         try:
-            zone_params = target_object['placement_zone']
+            zone = target_object.placement_zone
             movement_plan = [
-                {'joint': 'base', 'angle': zone_params['angle'], 'speed': 30},
-                {'joint': 'arm', 'distance': zone_params['distance'], 'action': 'place'},
+                {'joint': 'base', 'angle': zone.angle, 'speed': 30},
+                {'joint': 'arm', 'distance': zone.distance, 'action': 'place'},
                 {'joint': 'gripper', 'action': 'open'},
-                {'joint': 'arm', 'distance': target_object['distance'], 'action': 'up'},
+                {'joint': 'arm', 'distance': target_object.distance, 'action': 'up'},
                 {'joint': 'base', 'angle': 0, 'speed': 60},  # Regresar a base 0
             ]
             self.execute_movement('place_service', movement_plan)
@@ -367,56 +557,86 @@ class Robot:
         
     def execute_movement(self, message_type: str, movement_sequence: list):
         """execute movements on arm"""
-        log.info("\nexecution movements:")
+        self._discard_prefetched_scan()
+        lines = ["\nexecution movements:"]
 
-        for move in movement_sequence:
-            try:
-                joint = move['joint']
-                log.info(f"movement: {joint}")
-
-                # execute movement - ahora siempre intenta usar hardware directo
-                if joint == 'base':
-                    log.info(f"  HARDWARE: Base -> ángulo {move['angle']}° a velocidad {move.get('speed', 30)}")
-                    self.robot_controller.move_base(move['angle'], move.get('speed', 30))
-                elif joint == 'arm':
-                    if 'action' in move:
-                        if move['action'] == 'pick':
-                            log.info(f"  HARDWARE: Brazo -> bajando {move['distance']}mm para recoger")
-                            self.robot_controller.move_arm(move['distance'], direction=-1)  # down
-                        elif move['action'] == 'up':
-                            log.info(f"  HARDWARE: Brazo -> subiendo {move.get('distance', 50)}mm")
-                            self.robot_controller.up_action(move.get('distance', 50))
-                        elif move['action'] == 'place':
-                            log.info(f"  HARDWARE: Brazo -> bajando {move['distance']}mm para colocar")
-                            self.robot_controller.move_arm(move['distance'], direction=-1)  # down
+        # the whole sequence goes to the actuation process in one command
+        try:
+            with self.robot_controller.batch():
+                for frame in self._group_servo_frames(movement_sequence):
+                    if len(frame) > 1:
+                        self._execute_servo_frame(frame, lines)
                     else:
-                        log.info(f"  HARDWARE: Brazo -> movimiento a distancia {move['distance']}mm")
-                        self.robot_controller.move_arm(move['distance'], direction=1)
-                elif joint == 'gripper':
-                    if move['action'] == 'close':
-                        log.info(f"  HARDWARE: Pinza -> cerrando")
-                        self.robot_controller.place_action()
-                    elif move['action'] == 'open':
-                        log.info(f"  HARDWARE: Pinza -> abriendo")
-                        self.robot_controller.pick_action()
-
-                # log
-                log.info(f"-> ¡Movement {joint} completed!")
+                        self._execute_move(frame[0], lines)
 
-            except Exception as e:
-                log.error(f'error in movement: {str(e)}')
-                self.handle_movement_failure()
-                raise
+        except Exception as e:
+            log.error(f'error in movement: {str(e)}')
+            self.handle_movement_failure()
+            raise
+
+        # logged once the batch has run, so only moves that actually happened are reported
+        log.info("\n".join(lines))
+        log.info(f"-> ¡Movement sequence {message_type} completed!")
+
+    def _group_servo_frames(self, movement_sequence: list) -> list:
+        """group consecutive servo angle moves on different joints into one frame"""
+        frames = []
+        frame_joints = set()
+        for move in movement_sequence:
+            is_servo = move.get('joint') in SERVO_JOINTS and 'angle' in move
+            if is_servo and frame_joints and move['joint'] not in frame_joints:
+                frames[-1].append(move)
+                frame_joints.add(move['joint'])
+            else:
+                frames.append([move])
+                frame_joints = {move['joint']} if is_servo else set()
+        return frames
+
+    def _execute_servo_frame(self, frame: list, lines: list):
+        """send every servo of the frame in one I2C transaction"""
+        angles = {move['joint']: move['angle'] for move in frame}
+        speed = min(move.get('speed', 30) for move in frame)
+        lines.append(f"  HARDWARE: Servos -> {angles} a velocidad {speed}")
+        self.robot_controller.move_joints(angles, speed)
+
+    def _execute_move(self, move: dict, lines: list):
+        """execute a single movement"""
+        joint = move['joint']
+        lines.append(f"movement: {joint}")
+
+        handler = self._move_dispatch.get((joint, move.get('action')))
+        if handler is not None:
+            handler(move, lines)
+
+    def _move_base(self, move: dict, lines: list):
+        speed = move.get('speed', 30)
+        lines.append(f"  HARDWARE: Base -> ángulo {move['angle']}° a velocidad {speed}")
+        self.robot_controller.move_base(move['angle'], speed)
+
+    def _move_arm(self, move: dict, lines: list):
+        lines.append(f"  HARDWARE: Brazo -> movimiento a distancia {move['distance']}mm")
+        self.robot_controller.move_arm(move['distance'], direction=1)
+
+    def _lower_arm(self, move: dict, lines: list, purpose: str):
+        lines.append(f"  HARDWARE: Brazo -> bajando {move['distance']}mm para {purpose}")
+        self.robot_controller.move_arm(move['distance'], direction=-1)  # down
+
+    def _raise_arm(self, move: dict, lines: list):
+        distance = move.get('distance', 50)
+        lines.append(f"  HARDWARE: Brazo -> subiendo {distance}mm")
+        self.robot_controller.up_action(distance)
+
+    def _gripper_action(self, verb: str, action, move: dict, lines: list):
+        lines.append(f"  HARDWARE: Pinza -> {verb}")
+        action()
             
     def handle_movement_failure(self):
         """Handles faults in the motion sequence"""
         log.error('executing security protocol')
         # Move to safe position
         try:
-            self.robot_controller.move_base(0)
-            self.robot_controller.move_shoulder(90)
-            self.robot_controller.move_elbow(90)
-            self.robot_controller.move_gripper(0)
+            # all four servos in one I2C burst, then the stepper
+            self.robot_controller.move_joints({'base': 0, 'shoulder': 90, 'elbow': 90, 'gripper': 0})
             self.robot_controller.up_action(100)  # Move up
             log.info("system safety - moved to safe position")
         except Exception as e:
@@ -435,6 +655,13 @@ class Robot:
         finally:
             log.info("closing robot controller.")
             self.robot_controller.close()
+            # stop a running prefetch first: shutdown waits for it otherwise
+            self._discard_prefetched_scan()
+            self._scan_worker.shutdown(cancel_futures=True)
+            # only if it was opened: cached_property stores it in the instance dict
+            camera = self.__dict__.get('camera')
+            if camera is not None:
+                camera.close()
             if self.serial_manager:
                 self.serial_manager.close()
 
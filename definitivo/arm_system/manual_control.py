@@ -14,6 +14,15 @@ except ImportError:
 
 log.basicConfig(level=log.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# comando -> (articulación, nombre mostrado)
+JOINT_MAP = {
+    'b': ('base', 'Base'),
+    's': ('shoulder', 'Hombro'),
+    'e': ('elbow', 'Codo'),
+    'g': ('gripper', 'Pinza')
+}
+JOINT_DISPLAY_NAMES = {joint: display_name for joint, display_name in JOINT_MAP.values()}
+
 class ManualController:
     def __init__(self):
         self.controlador_robot = ControladorRobotico()
@@ -79,16 +88,9 @@ class ManualController:
     def parse_command(self, cmd):
         """Parse and execute manual command"""
         try:
-            if cmd[0] in ['b', 's', 'e', 'g']:
+            if cmd[0] in JOINT_MAP:
                 # Servo control
-                joint_map = {
-                    'b': ('base', 'Base'),
-                    's': ('shoulder', 'Hombro'),
-                    'e': ('elbow', 'Codo'),
-                    'g': ('gripper', 'Pinza')
-                }
-
-                joint, display_name = joint_map[cmd[0]]
+                joint, display_name = JOINT_MAP[cmd[0]]
                 angle = int(cmd[1:])
 
                 # Todos los servos configurados para 360°
@@ -136,14 +138,7 @@ class ManualController:
             new_angle = max(0, min(360, new_angle))
 
             if new_angle != current:
-                joint_names = {
-                    'base': 'Base',
-                    'shoulder': 'Hombro',
-                    'elbow': 'Codo',
-                    'gripper': 'Pinza'
-                }
-
-                display_name = joint_names[self.selected_joint]
+                display_name = JOINT_DISPLAY_NAMES[self.selected_joint]
                 # SOLO registrar el ángulo - NO mover físicamente
                 self.current_angles[self.selected_joint] = new_angle
                 print(f"✅ REGISTRADO: {display_name} en {new_angle}°")
@@ -1,53 +1,163 @@
+import math
 import numpy as np
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Union, Optional
+
+try:
+    from numba import njit
+except ImportError:
+    # fallback for environments without numba: the NumPy path is used
+    njit = None
+
+# log-odds are clipped so a cell never becomes certain and can still change
+LOGODDS_MAX = 10.0
+
+# packed scan readings: update_from_scan reads the columns without copying
+SCAN_DTYPE = np.dtype([('angle', np.float32), ('distance', np.float32)])
+
+
+def _integrate_scan(logodds, visited, angles, distances, robot_x, robot_y, robot_theta,
+                    resolution, origin_x, origin_y, width, height, l_occ, l_max):
+    """
+    trace every ray of a scan and update the log-odds grid without temporaries
+    same order as the NumPy path: every occupied endpoint first, then the free
+    cells of every ray, so both backends store the same map
+    rays are integrated one after another: numba has no atomic add for CPU
+    arrays, so a prange over rays would lose updates on shared cells
+    """
+    robot_grid_x = int(robot_x / resolution) + origin_x
+    robot_grid_y = int(robot_y / resolution) + origin_y
+    
+    count = len(angles)
+    grid_xs = np.empty(count, dtype=np.int64)
+    grid_ys = np.empty(count, dtype=np.int64)
+    
+    # occupied endpoints
+    for i in range(count):
+        theta = robot_theta + angles[i]
+        grid_x = int((robot_x + distances[i] * math.cos(theta)) / resolution) + origin_x
+        grid_y = int((robot_y + distances[i] * math.sin(theta)) / resolution) + origin_y
+        grid_xs[i] = grid_x
+        grid_ys[i] = grid_y
+        if 0 <= grid_x < width and 0 <= grid_y < height:
+            logodds[grid_y, grid_x] = min(logodds[grid_y, grid_x] + l_occ, l_max)
+            visited[grid_y, grid_x >> 3] |= 1 << (grid_x & 7)
+    
+    # free cells along every ray, endpoint excluded
+    for i in range(count):
+        dx = grid_xs[i] - robot_grid_x
+        dy = grid_ys[i] - robot_grid_y
+        steps = max(abs(dx), abs(dy))
+        for k in range(steps):
+            t = k / steps
+            # round half up, like _ray_cells (rint's half-to-even breaks the staircase)
+            x = int(math.floor(robot_grid_x + t * dx + 0.5))
+            y = int(math.floor(robot_grid_y + t * dy + 0.5))
+            if 0 <= x < width and 0 <= y < height:
+                logodds[y, x] = max(logodds[y, x] - l_occ, -l_max)
+                visited[y, x >> 3] |= 1 << (x & 7)
+
+
+if njit is not None:
+    _integrate_scan = njit(cache=True)(_integrate_scan)
+else:
+    _integrate_scan = None
 
 
 class OccupancyGrid:
-    def __init__(self, width: int=100, height: int=100, resolution: float=0.5):
+    def __init__(self, width: int=100, height: int=100, resolution: float=0.5, sensor_accuracy: float=0.9):
         """
         initialize occupancy grid
         args:
             width: int: width of grid
             height: int: height of grid
             resolution: float: resolution of grid
+            sensor_accuracy: float: default precision of sensor
         """
         
         self.width = width
         self.height = height
         self.resolution = resolution
         
-        # initialize grid
-        # 0-100 -> probability of cell being occupied
-        # -1 -> cell is unknown
-        self.grid = np.full((self.width, self.height), -1, dtype=np.int8)
+        # cells are stored as log-odds of being occupied (0 -> p=0.5), so a
+        # bayesian update is a single addition; the 0-100 grid is derived on demand
+        # both planes are row-major (height, width) and indexed [y, x]; visited packs
+        # one bit per cell, x-fastest (bit x & 7 of byte x >> 3)
+        self.logodds = np.zeros((self.height, self.width), dtype=np.float32)
+        self.visited = np.zeros((self.height, (self.width + 7) // 8), dtype=np.uint8)
+        self._grid = None
         
-        # map origin (center)
+        # map origin (center) as (x, y)
         self.origin = (width//2, height//2)
         
-    def update_cell(self, x: int, y: int, occupied: bool, sensor_accuracy: float=0.9):
+        self.set_sensor_accuracy(sensor_accuracy)
+        
+    def set_sensor_accuracy(self, sensor_accuracy: float):
+        """precompute the log-odds step of the sensor model used by default"""
+        self.sensor_accuracy = sensor_accuracy
+        self._l_occ = self._logodds_step(sensor_accuracy)
+        
+    @staticmethod
+    def _logodds_step(sensor_accuracy: float) -> float:
+        """log-odds added by an occupied observation (subtracted by a free one)"""
+        return math.log(sensor_accuracy / (1 - sensor_accuracy))
+        
+    @property
+    def grid(self) -> np.ndarray:
+        """
+        occupancy grid
+        0-100 -> probability of cell being occupied
+        -1 -> cell is unknown
+        """
+        if self._grid is None:
+            grid = (100.0 / (1.0 + np.exp(-self.logodds))).astype(np.int8)
+            known = np.unpackbits(self.visited, axis=1, count=self.width, bitorder='little')
+            grid[known == 0] = -1
+            self._grid = grid
+        return self._grid
+        
+    def is_known(self, x: int, y: int) -> bool:
+        """true if the cell has been observed at least once"""
+        return bool((self.visited[y, x >> 3] >> (x & 7)) & 1)
+        
+    def update_cell(self, x: int, y: int, occupied: bool, sensor_accuracy: Optional[float]=None):
         """
         update cell in grid using probabilistic sensor model
         args:
             x, y: coordinates of cell
             occupied: true if the sensor detected an obstacle
-            sensor_accuracy: precision of sensor
+            sensor_accuracy: precision of sensor (None -> the grid's default)
         """
         if not (0 <= x < self.width and 0 <= y < self.height):
             return
         
-        current = self.grid[y, x]
-        if current == -1:
-            # first observation
-            self.grid[y, x] = 100 if occupied else 50
-        else:
-            # baysian update
-            prior = current / 100.0
-            if occupied:
-                posterior = (sensor_accuracy * prior) / (sensor_accuracy * prior + (1 - sensor_accuracy) * (1 - prior))
-            else:
-                posterior = ((1 - sensor_accuracy) * prior) / ((1 - sensor_accuracy) * prior + sensor_accuracy * (1 - prior))
-            
-            self.grid[y, x] = int(posterior * 100)
+        # bayesian update in log-odds form
+        l_occ = self._l_occ if sensor_accuracy is None else self._logodds_step(sensor_accuracy)
+        value = self.logodds[y, x] + (l_occ if occupied else -l_occ)
+        self.logodds[y, x] = min(max(value, -LOGODDS_MAX), LOGODDS_MAX)
+        self.visited[y, x >> 3] |= 1 << (x & 7)
+        self._grid = None
+        
+    def update_cells(self, xs: np.ndarray, ys: np.ndarray, occupied, sensor_accuracy: Optional[float]=None):
+        """
+        update many cells at once; a cell repeated in xs, ys is updated once per repetition
+        args:
+            xs, ys: coordinates of cells
+            occupied: bool or bool array, true where the sensor detected an obstacle
+            sensor_accuracy: precision of sensor (None -> the grid's default)
+        """
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xs = xs[inside]
+        ys = ys[inside]
+        
+        l_occ = np.float32(self._l_occ if sensor_accuracy is None else self._logodds_step(sensor_accuracy))
+        occupied = np.broadcast_to(occupied, inside.shape)[inside]
+        np.add.at(self.logodds, (ys, xs), np.where(occupied, l_occ, -l_occ))
+        # clip only the touched cells: the update stays O(cells), not O(grid)
+        self.logodds[ys, xs] = np.clip(self.logodds[ys, xs], -LOGODDS_MAX, LOGODDS_MAX)
+        np.bitwise_or.at(self.visited, (ys, xs >> 3), np.left_shift(1, xs & 7).astype(np.uint8))
+        self._grid = None
             
     def world_to_grid(self, world_x: float, world_y: float) -> tuple[int, int]:
         """"convert coordinates from world to grid"""
@@ -55,31 +165,58 @@ class OccupancyGrid:
         grid_y = int(world_y / self.resolution) + self.origin[1]
         return grid_x, grid_y
     
-    def update_from_scan(self, robot_pose: Tuple[float, float, float], scan_data: List[Dict[str, float]]):
+    def update_from_scan(self, robot_pose: Tuple[float, float, float], scan_data: Union[np.ndarray, List[Dict[str, float]]],
+                         sensor_accuracy: Optional[float]=None):
         """
         update map using scan data
         args:
         robot_pose: (x, y, theta) in world coordinates
-        scan_data: list of sensor readings (distance, angle)
+        scan_data: SCAN_DTYPE array or list of sensor readings (inertial_angle, base_distance)
+        sensor_accuracy: precision of sensor (None -> the grid's default)
         """
         
         robot_x, robot_y, robot_theta = robot_pose
+        count = len(scan_data)
+        if not count:
+            return
         
-        for scan in scan_data:
-            angle = scan['inertial_angle']
-            distance = scan['base_distance']
-            
-            # convert coordinates: polar to cartesian
-            world_x = robot_x + distance * np.cos(robot_theta + angle)
-            world_y = robot_y + distance * np.sin(robot_theta + angle)
-            
-            # update cells
-            grid_x, grid_y = self.world_to_grid(world_x, world_y)
-            self.update_cell(grid_x, grid_y, occupied=True)
-            
-            # mark the cells in the path as free
-            robot_grid_x, robot_grid_y = self.world_to_grid(robot_x, robot_y)
-            self._mark_free_cells(robot_grid_x, robot_grid_y, grid_x, grid_y)
+        if isinstance(scan_data, np.ndarray) and scan_data.dtype == SCAN_DTYPE:
+            angles = scan_data['angle']
+            distances = scan_data['distance']
+        else:
+            angles = np.fromiter((scan['inertial_angle'] for scan in scan_data), dtype=np.float64, count=count)
+            distances = np.fromiter((scan['base_distance'] for scan in scan_data), dtype=np.float64, count=count)
+        
+        if _integrate_scan is not None:
+            # compiled kernel: trig, ray tracing and updates without temporary arrays
+            l_occ = self._l_occ if sensor_accuracy is None else self._logodds_step(sensor_accuracy)
+            # float32 steps, like update_cells, so both backends round the same way
+            _integrate_scan(self.logodds, self.visited, angles, distances,
+                            float(robot_x), float(robot_y), float(robot_theta), float(self.resolution),
+                            self.origin[0], self.origin[1], self.width, self.height,
+                            np.float32(l_occ), np.float32(LOGODDS_MAX))
+            self._grid = None
+            return
+        
+        # convert coordinates: polar to cartesian, every reading at once, in
+        # float64 like the kernel (float32 columns would round cells differently)
+        angles = angles.astype(np.float64, copy=False)
+        distances = distances.astype(np.float64, copy=False)
+        theta = robot_theta + angles
+        world_x = robot_x + distances * np.cos(theta)
+        world_y = robot_y + distances * np.sin(theta)
+        
+        # to grid coordinates (astype truncates toward zero, like int())
+        grid_xs = (world_x / self.resolution).astype(np.int32) + self.origin[0]
+        grid_ys = (world_y / self.resolution).astype(np.int32) + self.origin[1]
+        
+        # update cells
+        self.update_cells(grid_xs, grid_ys, occupied=True, sensor_accuracy=sensor_accuracy)
+        
+        # mark the cells in the path as free, every ray in one update
+        robot_grid_x, robot_grid_y = self.world_to_grid(robot_x, robot_y)
+        free_xs, free_ys = self._ray_cells(robot_grid_x, robot_grid_y, grid_xs, grid_ys)
+        self.update_cells(free_xs, free_ys, occupied=False, sensor_accuracy=sensor_accuracy)
             
     def _mark_free_cells(self, x0: int, y0: int, x1: int, y1: int):
         """
@@ -88,24 +225,27 @@ class OccupancyGrid:
             x0, y0: start coordinates
             x1, y1: end coordinates
         """
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        
-        x = x0
-        y = y0
-        n = 1 + dx + dy
-        x_inc = 1 if x1 > x0 else -1
-        y_inc = 1 if y1 > y0 else -1
-        error = dx - dy
-        dx *= 2
-        dy *= 2
-        
-        for _ in range(n):
-            self.update_cell(x, y, occupied=False)
-            if error > 0:
-                x += x_inc
-                error -= dy
-            else:
-                y += y_inc
-                error += dx
-                
\ No newline at end of file
+        xs, ys = self._ray_cells(x0, y0, np.array([x1]), np.array([y1]))
+        self.update_cells(xs, ys, occupied=False)
+        
+    @staticmethod
+    def _ray_cells(x0: int, y0: int, x1: np.ndarray, y1: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        cells crossed by the rays from (x0, y0) to every (x1, y1), endpoints excluded
+        args:
+            x0, y0: start coordinates
+            x1, y1: end coordinates of each ray
+        """
+        dx = x1 - x0
+        dy = y1 - y0
+        steps = np.maximum(np.abs(dx), np.abs(dy))
+        
+        # step i of ray k for every cell of every ray, concatenated
+        ray = np.repeat(np.arange(len(steps)), steps)
+        i = np.arange(len(ray)) - np.repeat(np.cumsum(steps) - steps, steps)
+        t = i / steps[ray]
+        
+        # round half up: np.rint rounds half to even and gives uneven staircases
+        xs = np.floor(x0 + t * dx[ray] + 0.5).astype(np.int32)
+        ys = np.floor(y0 + t * dy[ray] + 0.5).astype(np.int32)
+        return xs, ys
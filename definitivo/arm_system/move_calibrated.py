@@ -4,6 +4,7 @@ Move Robot Arm with Calibrated Angles
 Uses the angles registered in manual_control.py to move the physical arm
 """
 
+import re
 import time
 import logging as log
 try:
@@ -14,7 +15,18 @@ except ImportError:
 
 log.basicConfig(level=log.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# comando de articulación: letra seguida del ángulo (b90, s45)
+COMANDO_ARTICULACION_RE = re.compile(r'^([bseg])(-?\d+)$')
+
 class CalibratedMover:
+    # letra -> (método del controlador, nombre mostrado)
+    _JOINT_MAP = {
+        'b': ('mover_base', 'Base'),
+        's': ('mover_hombro', 'Hombro'),
+        'e': ('mover_codo', 'Codo'),
+        'g': ('mover_pinza', 'Pinza')
+    }
+
     def __init__(self):
         self.controlador_robot = ControladorRobotico()
         # Ángulos calibrados - CAMBIA estos valores por los que calibraste
@@ -24,6 +36,10 @@ class CalibratedMover:
             'elbow': 90,     # ← TU VALOR CALIBRADO AQUÍ
             'gripper': 0     # ← TU VALOR CALIBRADO AQUÍ
         }
+        self._cmds = {
+            'home': self.go_to_calibrated_position,
+            'test': self.test_movements,
+        }
         log.info("Calibrated Mover initialized")
 
     def run(self):
@@ -55,11 +71,11 @@ class CalibratedMover:
 
                 if cmd == 'q':
                     break
-                elif cmd == 'home':
-                    self.go_to_calibrated_position()
-                elif cmd == 'test':
-                    self.test_movements()
-                elif cmd.startswith(('b', 's', 'e', 'g')):
+
+                handler = self._cmds.get(cmd)
+                if handler is not None:
+                    handler()
+                elif cmd[:1] in self._JOINT_MAP:
                     self.move_to_angle(cmd)
                 else:
                     print("❌ Usa: b<ángulo>, s<ángulo>, e<ángulo>, g<ángulo>, home, test, q")
@@ -74,16 +90,14 @@ class CalibratedMover:
 
     def move_to_angle(self, cmd):
         """Move specific joint to angle"""
-        try:
-            joint_map = {
-                'b': ('base', 'Base'),
-                's': ('shoulder', 'Hombro'),
-                'e': ('elbow', 'Codo'),
-                'g': ('gripper', 'Pinza')
-            }
+        match = COMANDO_ARTICULACION_RE.match(cmd)
+        if not match:
+            print("❌ Formato inválido. Usa: b90, s45, etc.")
+            return
 
-            joint, display_name = joint_map[cmd[0]]
-            angle = int(cmd[1:])
+        try:
+            metodo, display_name = self._JOINT_MAP[match.group(1)]
+            angle = int(match.group(2))
 
             # Validar límites - todos los servos configurados para 360°
             if not (0 <= angle <= 360):
@@ -92,19 +106,10 @@ class CalibratedMover:
 
             print(f"🔄 Moviendo {display_name} a {angle}°...")
 
-            if joint == 'base':
-                self.controlador_robot.mover_base(angle, velocidad=2)
-            elif joint == 'shoulder':
-                self.controlador_robot.mover_hombro(angle, velocidad=2)
-            elif joint == 'elbow':
-                self.controlador_robot.mover_codo(angle, velocidad=2)
-            elif joint == 'gripper':
-                self.controlador_robot.mover_pinza(angle, velocidad=2)
+            getattr(self.controlador_robot, metodo)(angle, velocidad=2)
 
             print(f"✅ {display_name} movido a {angle}°")
 
-        except ValueError:
-            print("❌ Formato inválido. Usa: b90, s45, etc.")
         except Exception as e:
             print(f"❌ Error de movimiento: {e}")
 
@@ -112,13 +117,8 @@ class CalibratedMover:
         """Move to calibrated home position"""
         print("🏠 Yendo a posición calibrada...")
         try:
-            self.controlador_robot.mover_base(self.calibrated_angles['base'], velocidad=2)
-            time.sleep(0.3)
-            self.controlador_robot.mover_hombro(self.calibrated_angles['shoulder'], velocidad=2)
-            time.sleep(0.3)
-            self.controlador_robot.mover_codo(self.calibrated_angles['elbow'], velocidad=2)
-            time.sleep(0.3)
-            self.controlador_robot.mover_pinza(self.calibrated_angles['gripper'], velocidad=2)
+            # las cuatro articulaciones en una sola ráfaga I2C; se mueven a la vez
+            self.controlador_robot.mover_articulaciones(self.calibrated_angles, velocidad=2)
             print("✅ Posición calibrada alcanzada")
         except Exception as e:
             print(f"❌ Error yendo a posición calibrada: {e}")
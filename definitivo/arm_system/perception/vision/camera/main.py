@@ -1,29 +1,77 @@
 import os
 import cv2
 import time
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# JPEG encodes several times faster than PNG's zlib and is ~5x smaller on the SD card
+JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 90]
 
 class CameraManager:
-    def __init__(self, camera_index: int = 0, width: int = 1280, height: int = 720):
+    def __init__(self, camera_index: int = 0, width: int = 1280, height: int = 720, buffer_size: int = 1):
         self.cap = cv2.VideoCapture(camera_index)
+        # MJPG before the size: raw YUYV at 1280x720 saturates USB 2.0 well below 30 fps
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # keep the driver queue short so a capture returns a fresh frame;
+        # backends that ignore the property still need the stale frames flushed
+        self.flush_frames = 1 if self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size) else 5
+        # the scan thread and the serial detections share this camera
+        self._capture_lock = threading.Lock()
+        # disk writes run here so they overlap with the next grab
+        self._io = ThreadPoolExecutor(max_workers=2)
+        self._out_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'objects_images')
+        os.makedirs(self._out_dir, exist_ok=True)
         
-    def capture_image(self):
-        for _ in range(5):
-            self.cap.grab()
-        
-        ret, frame = self.cap.read()
+    def capture_array(self):
+        """Capture a BGR frame as a numpy array, without going through disk"""
+        with self._capture_lock:
+            for _ in range(self.flush_frames):
+                self.cap.grab()
+            
+            ret, frame = self.cap.read()
         if not ret:
             return None
+        return frame
+    
+    def new_image_path(self):
+        # millisecond timestamp: frames captured in the same second get distinct names
+        return f"{self._out_dir}/{int(time.time() * 1000)}.jpg"
         
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        timestamp = time.strftime("%Y%m%d-%H%M%S")
-        filename = f"{current_dir}/objects_images/{timestamp}.png"
+    def save_image(self, frame):
+        """Encode the frame as JPEG now and write it in the background; returns the path"""
+        filename = self.new_image_path()
+        # encoded before returning, so the caller may draw on the frame afterwards
+        ok, buf = cv2.imencode('.jpg', frame, JPEG_PARAMS)
+        if ok:
+            self._io.submit(Path(filename).write_bytes, buf)
+        return filename
         
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    def capture_image(self):
+        frame = self.capture_array()
+        if frame is None:
+            return None
+        return self.save_image(frame)
         
-        cv2.imwrite(filename, frame)
-        return filename
+    def close(self):
+        """Finish the pending writes and release the camera; safe to call more than once"""
+        # getattr: __init__ may have failed before these were set
+        io = getattr(self, '_io', None)
+        if io is not None:
+            io.shutdown()
+            self._io = None
+        cap = getattr(self, 'cap', None)
+        if cap is not None:
+            lock = getattr(self, '_capture_lock', None)
+            if lock is not None:
+                # not while the other user of the camera is mid-capture
+                with lock:
+                    cap.release()
+            else:
+                cap.release()
+            self.cap = None
         
     def __del__(self):
-        self.cap.release()
\ No newline at end of file
+        self.close()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import sys
 import numpy as np
 from typing import Tuple, Dict
 from abc import ABC, abstractmethod
@@ -14,9 +15,14 @@ class DetectionModelInterface(ABC):
 
 class DetectionModel(DetectionModelInterface):
     def __init__(self):
-        self.object_model = ModelLoader().get_model()
+        self.object_model = ModelLoader.get_model()
+        # lowercase class names, interned so zone lookups compare by identity
+        self.class_names = {i: sys.intern(name.lower()) for i, name in self.object_model.names.items()}
 
     def inference(self, image: np.ndarray) -> tuple[list[Results], Dict[int, str]]:
-        results = self.object_model.predict(image, conf=0.55, verbose=False, imgsz=640, stream=True, task='detect', half=True)
-        return results, self.object_model.names
+        # the model is shared across threads; consume the stream while holding the lock
+        with ModelLoader.inference_lock:
+            results = list(self.object_model.predict(image, conf=0.55, verbose=False, imgsz=640, stream=True, task='detect', half=True))
+        # the normalised names, so every consumer sees the same lowercase classes
+        return results, self.class_names
     
\ No newline at end of file
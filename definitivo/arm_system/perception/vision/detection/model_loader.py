@@ -1,15 +1,68 @@
 import os
+import threading
+import logging as log
+import numpy as np
 
-from typing import Dict
+from typing import Dict, Optional
 from ultralytics import YOLO
 
 
+def _cuda_available() -> bool:
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
 class ModelLoader:
-    def __init__(self):
+    # one model per process, shared by every DetectionModel / ImageProcessor
+    _model: Optional[YOLO] = None
+    _lock = threading.Lock()
+    # ultralytics predictors are not thread-safe: callers sharing the model serialize on this
+    inference_lock = threading.Lock()
+
+    @classmethod
+    def get_model(cls) -> YOLO:
+        """load the model on first use; later calls return the same instance"""
+        if cls._model is None:
+            with cls._lock:
+                if cls._model is None:
+                    cls._model = cls._load()
+        return cls._model
+
+    @classmethod
+    def _load(cls) -> YOLO:
         current_path = os.path.dirname(os.path.abspath(__file__))
         object_model_path: str = current_path + '/models/yolo11s_ncnn_model'
-        self.model: YOLO = YOLO(object_model_path, task='detect')
-        
-    def get_model(self) -> YOLO:
-        return self.model
-    
\ No newline at end of file
+
+        # on NVIDIA hardware use a TensorRT FP16 engine, exported once and cached next to the weights
+        if _cuda_available():
+            engine_path = cls._tensorrt_engine(current_path + '/models/yolo11s')
+            if engine_path:
+                object_model_path = engine_path
+
+        model = YOLO(object_model_path, task='detect')
+
+        # warm up with a blank frame so the first real inference does not pay the setup cost
+        for _ in model.predict(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False, imgsz=640,
+                               stream=True, half=True):
+            pass
+        return model
+
+    @staticmethod
+    def _tensorrt_engine(model_stem: str):
+        engine_path = model_stem + '.engine'
+        if os.path.exists(engine_path):
+            return engine_path
+
+        weights_path = model_stem + '.pt'
+        if not os.path.exists(weights_path):
+            return None
+        try:
+            log.info("exporting TensorRT engine, this runs only once...")
+            return YOLO(weights_path).export(format='engine', half=True, dynamic=True, batch=16)
+        except Exception as e:
+            log.warning(f"TensorRT export failed - using NCNN model: {e}")
+            return None
+    
@@ -1,17 +1,24 @@
 import cv2
 import numpy as np
 import logging as log
+from pathlib import Path
 log.basicConfig(level=log.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 from .detection.main import (DetectionModelInterface, DetectionModel)
 
+# classes with their own placement zone; anything else is reported as 'default'
+TARGET_CLASSES = frozenset({'apple', 'orange', 'bottle'})
+
 class ImageProcessor:
     def __init__(self, confidence_threshold: float = 0.45):
         self.detection: DetectionModelInterface = DetectionModel()
         self.conf_threshold = confidence_threshold
         
     def read_image_path(self, path: str, draw_results: bool = True, save_drawn_img: bool = True):
-        object_image = cv2.imread(path)
+        return self.read_image(cv2.imread(path), path, draw_results, save_drawn_img)
+        
+    def read_image(self, object_image: np.ndarray, path: str, draw_results: bool = True, save_drawn_img: bool = True):
+        """same as read_image_path for a frame already in memory; path is used to save the drawn image"""
         processed_img, best_detection = self.process_image(object_image, self.conf_threshold)
         
         if draw_results and best_detection is not None and best_detection.get('confidence', 0) > 0:
@@ -22,74 +29,81 @@ class ImageProcessor:
         return processed_img, best_detection
     
     def process_image(self, image: np.ndarray, confidence_threshold: float =0.45):
+        return self.process_batch([image], confidence_threshold)[0]
+    
+    def process_batch(self, images: list, confidence_threshold: float =0.45) -> list:
+        """detect the best object in every image with one inference call; returns (image, best_detection) pairs"""
         try:
-            # 1. inference
-            copy_image = image.copy()
-            object_results, object_classes = self.detection.inference(copy_image)
+            # 1. inference (the model does not modify its input, no copy needed)
+            object_results, object_classes = self.detection.inference(images if len(images) > 1 else images[0])
             
-            # 2. init variables
-            best_detection = {'class': '', 'confidence': 0.0, 'box': [], 'class_id': -1}
+            # 2. process results, one per image
+            return [(image, self._best_detection(res, object_classes, confidence_threshold))
+                    for image, res in zip(images, object_results)]
+        except Exception as e:
+            log.info(f'error un image processing: {e}')
+            return [(image, None) for image in images]
+        
+    def _best_detection(self, res, object_classes: dict, confidence_threshold: float) -> dict:
+        best_detection = {'class': '', 'confidence': 0.0, 'box': [], 'class_id': -1}
+        boxes = res.boxes
+        
+        if boxes.shape[0] > 0:
+            # pick the winner on the tensor, then one device->host copy of its row: x1, y1, x2, y2, conf, cls
+            best_box = boxes.data[int(boxes.conf.argmax())].cpu().numpy()
+            confidence = best_box[4]
+            class_id = int(best_box[5])
+            box_data = best_box[:4]
             
-            # 3. process results
-            for res in object_results:
-                boxes = res.boxes
-                
-                if boxes.shape[0] == 0:
-                        continue
-                    
-                confidence = boxes.conf.cpu().numpy()[0]
-                class_id = int(boxes.cls[0])
-                box_data = boxes.xyxy.cpu().numpy()[0]
-                    
-                if confidence < confidence_threshold:
-                    continue
-                    
+            if confidence >= confidence_threshold:
                 detected_class = object_classes[class_id]
                 clss_object = 'default'
-                    
-                if detected_class in ['apple', 'orange', 'bottle']:
+                
+                if detected_class in TARGET_CLASSES:
                     clss_object = detected_class
                     
                 log.info(f'class: {clss_object}')
-                        
-                if confidence > best_detection['confidence']:
-                    best_detection.update({
-                        'class': str(clss_object),
-                        'confidence': float(confidence),
-                        'box': box_data,
-                        'class_id': class_id
-                    })
-                        
-            # 4. final result
-            if best_detection['confidence'] >= confidence_threshold:
-                log.info(f"best detection: {best_detection}")
-                return image, best_detection
-            else:
-                log.info("not found detections")
-                return image, best_detection
-        except Exception as e:
-            log.info(f'error un image processing: {e}')
-            return image, None
+                best_detection.update({
+                    'class': str(clss_object),
+                    'confidence': float(confidence),
+                    'box': box_data,
+                    'class_id': class_id
+                })
+        
+        # final result
+        if best_detection['confidence'] >= confidence_threshold:
+            log.info(f"best detection: {best_detection}")
+        else:
+            log.info("not found detections")
+        return best_detection
         
     def _draw_detection(self, image: np.ndarray, detection: dict):
         """
         draw image. 
         """
-        box = detection['box']
-        class_name = detection['class']
-        confidence = detection['confidence']
+        self._draw_detections(image, [detection])
 
-        x1, y1, x2, y2 = map(int, box)
+    def _draw_detections(self, image: np.ndarray, detections: list):
+        """
+        draw every detection: all boxes in one polylines call, then the labels.
+        """
         color = (0, 255, 0)  # BGR - verde
-        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+        boxes = np.asarray([d['box'] for d in detections], dtype=np.float64).astype(np.int32)
+        x1, y1, x2, y2 = boxes.T
+        rects = np.stack([np.stack([x1, y1], -1), np.stack([x2, y1], -1),
+                          np.stack([x2, y2], -1), np.stack([x1, y2], -1)], axis=1)
+        cv2.polylines(image, list(rects), True, color, 2)
 
-        label = f"{class_name} {confidence:.2f}"
-        cv2.putText(image, label, (x1, y1 - 10),cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        labels = [f"{d['class']} {d['confidence']:.2f}" for d in detections]
+        for label, x, y in zip(labels, x1.tolist(), y1.tolist()):
+            cv2.putText(image, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
 
     def _save_drawn_image(self, image: np.ndarray, original_path: str):
         """
         save image.
         """
-        out_path = original_path.replace('.jpg', '_detected.jpg')
-        cv2.imwrite(out_path, image)
+        # <stem>_detected.jpg whatever the original suffix, so the original is never overwritten
+        path = Path(original_path)
+        out_path = str(path.with_name(path.stem + '_detected.jpg'))
+        cv2.imwrite(out_path, image, [cv2.IMWRITE_JPEG_QUALITY, 85])
         log.info(f"save image with draw detections: {out_path}")
\ No newline at end of file
@@ -10,9 +10,21 @@
 
 # Library imports
 from vex import *
-import json
 import time
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    # fallback for the brain's MicroPython (ujson) and hosts without orjson
+    try:
+        import ujson as json
+    except ImportError:
+        import json
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+    _json_loads = lambda data: json.loads(data.decode())
+
 # colors
 LED_COLORS = {
     'ERROR': (255, 0, 0),         # Red: Error/Stop
@@ -21,13 +33,25 @@ LED_COLORS = {
     'RUNNING': (0, 0, 255),       # Blue: Process Running
     'INIT': (255, 255, 255)       # White: Initialization
 }
+# bound once so the per-tick set_color calls skip the dict lookup
+_LED_ERROR = LED_COLORS['ERROR']
+_LED_WARNING = LED_COLORS['WARNING']
+_LED_READY = LED_COLORS['READY']
+_LED_RUNNING = LED_COLORS['RUNNING']
+_LED_INIT = LED_COLORS['INIT']
 
 # serial communication
 class CommunicationManager:
+    # fixed attribute set: no per-instance __dict__ on ports that honour __slots__
+    __slots__ = ('serial_port', 'buffer', 'message_end', '_envelope_prefix', '_envelope_suffix')
+    
     def __init__(self):
         self.serial_port = None
         self.buffer = bytearray()
         self.message_end = b'\n'
+        # '{"type":...,"data":' envelope per message type, encoded on first use
+        self._envelope_prefix = {}
+        self._envelope_suffix = b'}' + self.message_end
         
     def initialize(self):
         try:
@@ -36,31 +60,44 @@ class CommunicationManager:
             raise Exception('serial port error')
         
     def read_message(self):
-        char = self.serial_port.read(1)
-        if char == self.message_end:
-            message = self.buffer.decode()
+        # one read call per message instead of one per byte
+        chunk = self.serial_port.readline()
+        if not chunk:
+            return None
+        if chunk[-1:] != self.message_end:
+            # partial line (read timed out): keep it until the rest arrives
+            self.buffer.extend(chunk)
+            return None
+        
+        if self.buffer:
+            self.buffer.extend(chunk)
+            message = self.buffer[:-1]
             self.buffer = bytearray()
-            try:
-                return json.loads(message)
-            except json.JSONDecodeError:
-                return None
         else:
-            self.buffer.extend(char)
-        return None
+            # whole line in one read (the usual case): parse it without touching the buffer
+            message = chunk[:-1]
+        try:
+            return _json_loads(message)
+        except ValueError:
+            # JSONDecodeError (json, orjson) subclasses ValueError; ujson raises it directly
+            return None
     
-    def send_message(self, msg_type: str, data: dict):        
-        message = {
-            'type': msg_type,
-            'data': data,
-        }
-            
-        encoded_message = json.dumps(message).encode() + self.message_end
+    def send_message(self, msg_type: str, data: dict):
+        # only data is serialized; the envelope around it is cached per type
+        prefix = self._envelope_prefix.get(msg_type)
+        if prefix is None:
+            prefix = b'{"type":"' + msg_type.encode() + b'","data":'
+            self._envelope_prefix[msg_type] = prefix
+        
+        encoded_message = prefix + _json_dumps(data) + self._envelope_suffix
         self.serial_port.write(encoded_message)
         return True
     
 
 # sensor module
 class SensorModule:
+    __slots__ = ('brain', 'inertial', 'gripper_distance', 'touchled', 'base_distance', 'bumper', '_color')
+    
     def __init__(self):
         self.brain = Brain()
         self.inertial = Inertial()
@@ -68,6 +105,7 @@ class SensorModule:
         self.touchled = Touchled(Ports.PORT8)
         self.base_distance = Distance(Ports.PORT9)
         self.bumper = Bumper(Ports.PORT10)
+        self._color = None
         
     def clear_screen(self):
         self.brain.screen.clear_screen()
@@ -91,6 +129,10 @@ class SensorModule:
         return self.bumper.pressing()
     
     def set_color(self, color):
+        # perception sets the same color tuple every tick: only changes reach the LED
+        if color is self._color:
+            return
+        self._color = color
         self.touchled.set_color(*color)
         
     def check_sensors(self):
@@ -103,6 +145,8 @@ class SensorModule:
 
 # perception module
 class PerceptionModule:
+    __slots__ = ('sensor', 'current_object_size', 'object_detected')
+    
     def __init__(self, sensor_module):
         self.sensor = sensor_module
         self.current_object_size = 0
@@ -113,38 +157,44 @@ class PerceptionModule:
         if min_d <= dist <= max_d:
             self.current_object_size = self.sensor.get_object_size(sensor)
             self.object_detected = True
-            self.sensor.set_color(LED_COLORS['READY'])
+            self.sensor.set_color(_LED_READY)
         else:
             self.current_object_size = 0
             self.object_detected = False
-            self.sensor.set_color(LED_COLORS['RUNNING'])
+            self.sensor.set_color(_LED_RUNNING)
             
-        return {'distance': dist, 'size': self.current_object_size, 'detected': self.object_detected}
+        return dist, self.current_object_size, self.object_detected
     
     
 # mapping module
 class MappingModule:
+    __slots__ = ('objects_map', '_co_start', '_co_end', '_co_max_size', '_co_distance', '_co_tracking')
+    
     def __init__(self):
         self.objects_map = []
-        self.current_object = (0.0, 0.0, 0, 0, False)  # (start, end, max_size, distance, tracking)
+        # object being tracked, mutated in place every tick
+        self._co_start = 0.0
+        self._co_end = 0.0
+        self._co_max_size = 0
+        self._co_distance = 0
+        self._co_tracking = False
     
     def process_object_detection(self, angle, size, dist):
         if size > 0:
-            if not self.current_object[4]:
-                self.current_object = (angle, angle, size, dist, True)
+            if not self._co_tracking:
+                self._co_start = self._co_end = angle
+                self._co_max_size = size
+                self._co_distance = dist
+                self._co_tracking = True
             else:
-                self.current_object = (
-                    self.current_object[0],
-                    angle,
-                    max(self.current_object[2], size),
-                    self.current_object[3],
-                    True
-                )
-        elif self.current_object[4]:
+                self._co_end = angle
+                if size > self._co_max_size:
+                    self._co_max_size = size
+        elif self._co_tracking:
             self._save_object(angle)
             
     def _save_object(self, end_angle):
-        start, _, max_size, dist, _ = self.current_object
+        start = self._co_start
         end = end_angle
         
         # Cálculo optimizado del ángulo central
@@ -154,10 +204,10 @@ class MappingModule:
         self.objects_map.append({
             'center_angle': round(center, 1),
             'width': round(total, 1),
-            'distance': dist,
-            'max_size': max_size
+            'distance': self._co_distance,
+            'max_size': self._co_max_size
         })
-        self.current_object = (0.0, 0.0, 0, 0, False)
+        self._co_tracking = False
     
     def get_objects_map(self):
         result = self.objects_map
@@ -167,12 +217,16 @@ class MappingModule:
 
 # control module
 class ControlModule:
+    __slots__ = ('base_motor', 'shoulder_motor', 'elbow_motor', 'gripper_motor', 'sensor_module', '_all_motors')
+    
     def __init__(self, sensor_module:SensorModule):
         self.base_motor = Motor(Ports.PORT1, True)
         self.shoulder_motor = Motor(Ports.PORT2, True)
         self.elbow_motor = Motor(Ports.PORT3, True)
         self.gripper_motor = Motor(Ports.PORT4, True)
         self.sensor_module = sensor_module
+        # built once: general_stop runs from the error handler and should not allocate
+        self._all_motors = (self.base_motor, self.shoulder_motor, self.elbow_motor, self.gripper_motor)
         
         self.elbow_motor.set_max_torque(95, PERCENT)
         self.shoulder_motor.set_max_torque(95, PERCENT)
@@ -180,15 +234,26 @@ class ControlModule:
     def move_motor_to_angle(self, motor, target, speed):
         if motor == self.base_motor:
             current = self.sensor_module.get_angle()
-            delta = (target - current + 360) % 360
-            if delta > 180: delta -= 360  # Convertir a camino más corto (-180 a 180)
+            delta = (target - current + 180) % 360 - 180  # Camino más corto (-180 a 180)
             
             direction = FORWARD if delta > 0 else REVERSE
             target_angle = (current + delta) % 360
             
-            while abs(self.sensor_module.get_angle() - target_angle) > 2:
-                motor.spin(direction, speed, RPM)
-                wait(10, MSEC)
+            # spin once and poll the heading; the command is only re-sent to slow down
+            commanded = speed
+            motor.spin(direction, commanded, RPM)
+            while True:
+                # signed remaining error, shortest way round (-180 to 180)
+                error = (target_angle - self.sensor_module.get_angle() + 180) % 360 - 180
+                # stop inside the window or once the target has been passed
+                if abs(error) <= 2 or (error > 0) != (delta > 0):
+                    break
+                if abs(error) < 20:
+                    slowed = int(speed * max(0.25, abs(error) / 20))
+                    if slowed < commanded:
+                        commanded = slowed
+                        motor.spin(direction, commanded, RPM)
+                wait(5, MSEC)
             motor.stop()
             
     def get_position(self, motor):
@@ -198,18 +263,17 @@ class ControlModule:
         return motor.current()
     
     def general_stop(self):
-        for m in [self.base_motor, self.shoulder_motor, self.elbow_motor, self.gripper_motor]:
+        for m in self._all_motors:
             m.stop()
     
     def check_motors(self):
-        return all(m.installed() for m in [
-            self.base_motor, self.shoulder_motor, 
-            self.elbow_motor, self.gripper_motor
-        ])
+        return all(m.installed() for m in self._all_motors)
         
 
 # safety module
 class SafetyModule:    
+    __slots__ = ('sensor_module', 'control_module', 'error_count')
+    
     def __init__(self, sensor: SensorModule, control:ControlModule):
         self.sensor_module = sensor
         self.control_module = control
@@ -222,34 +286,51 @@ class SafetyModule:
     def check_sensors(self):
         return self.sensor_module.check_sensors()
         
-    def check_shoulder_safety(self, speed_forward: int, speed_reverse: int):
-        if self.sensor_module.is_bumper_pressed():
-            self.control_module.general_stop()
-            self.sensor_module.set_color(LED_COLORS['ERROR'])
-            self.control_module.shoulder_motor.spin(REVERSE, speed_reverse)
-            wait(2, SECONDS)
-            self.control_module.shoulder_motor.stop(HOLD)
-            return True
-        else:
-            self.control_module.shoulder_motor.spin(FORWARD, speed_forward)
-            self.control_module.elbow_motor.spin(REVERSE, 40)
-            self.sensor_module.set_color(LED_COLORS['WARNING'])
+    def start_shoulder_up(self, speed_forward: int):
+        self.control_module.shoulder_motor.spin(FORWARD, speed_forward)
+        self.control_module.elbow_motor.spin(REVERSE, 40)
+        self.sensor_module.set_color(_LED_WARNING)
+        
+    def check_shoulder_done(self, speed_reverse: int):
+        if not self.sensor_module.is_bumper_pressed():
             return False
+        self.control_module.general_stop()
+        self.sensor_module.set_color(_LED_ERROR)
+        self.control_module.shoulder_motor.spin(REVERSE, speed_reverse)
+        wait(2, SECONDS)
+        self.control_module.shoulder_motor.stop(HOLD)
+        return True
     
-    def gripper_action(self, action, service):
-        self.control_module.shoulder_motor.stop( BRAKE)
+    def shoulder_up(self, speed_forward: int, speed_reverse: int):
+        # the motors keep spinning on their own: spin once, then poll only the bumper
+        if self.check_shoulder_done(speed_reverse):
+            return
+        self.start_shoulder_up(speed_forward)
+        while not self.check_shoulder_done(speed_reverse):
+            wait(10, MSEC)
+    
+    def start_gripper(self, action, service):
+        self.control_module.shoulder_motor.stop(BRAKE)
         self.control_module.elbow_motor.stop(BRAKE)
-        threshold = 0.5 if service == 'pick' else 0.3
         self.control_module.gripper_motor.spin(FORWARD if action == 'open' else REVERSE, 20)
+        
+    def check_gripper_done(self, service):
+        threshold = 0.5 if service == 'pick' else 0.3
         if self.control_module.get_current(self.control_module.gripper_motor) > threshold:
             self.control_module.gripper_motor.stop(HOLD if service == 'pick' else BRAKE)
             return True
-        else:
-            return False
+        return False
+    
+    def gripper_action(self, action, service):
+        self.start_gripper(action, service)
+        while not self.check_gripper_done(service):
+            wait(10, MSEC)
     
     
 # main module
 class RoboticServices:
+    __slots__ = ('sensor', 'control', 'safety', 'perception', 'mapping', 'comms', 'states', 'safety_variables', 'scan_variables', '_dispatch')
+    
     def __init__(self):
         self.sensor = SensorModule()
         self.control = ControlModule(self.sensor)
@@ -280,35 +361,41 @@ class RoboticServices:
             'timeout': 40,
             'pause_for_object': False
         }
+        
+        # message type -> handler(msg_type, data)
+        self._dispatch = {
+            'check_service': self._on_check,
+            'safety_service': self._on_safety,
+            'scan_service': self._on_scan,
+            'pick_service': self._pick_place_service,
+            'place_service': self._pick_place_service,
+        }
         #self.sensor.calibrate_inertial()
         
     def run_service(self, service):
         try:
             if service == 'check':
                 if self.safety.check_sensors() and self.safety.check_motors():
-                    self.sensor.set_color(LED_COLORS['READY'])
+                    self.sensor.set_color(_LED_READY)
                     data = {'state': 'approved'}
                     self.comms.send_message('check_service', data)
                     self.states['check_active'] = False
                 else:
-                    self.sensor.set_color(LED_COLORS['ERROR'])
+                    self.sensor.set_color(_LED_ERROR)
                     data = {'error': 'Sensors or motors not installed'}
                     self.comms.send_message('check_error', data)
                     self.states['check_active'] = False
                     
             elif service == 'safety':
-                while self.states['safety_active']:
-                    if not self.safety_variables['safety_shoulder']:
-                        safety_shoulder = self.safety.check_shoulder_safety(speed_forward=60, speed_reverse=10)
-                        if safety_shoulder:
-                            self.safety_variables['safety_shoulder'] = True
-                    else:
-                        if not self.safety_variables['gripper_safety']:
-                            safety_gripper = self.safety.gripper_action('open', 'safety')
-                            if safety_gripper:
-                                self.states['safety_active'] = False
-                                self.safety_variables['gripper_safety'] = True
-                                self.sensor.set_color(LED_COLORS['READY'])
+                states = self.states
+                safety_variables = self.safety_variables
+                if states['safety_active']:
+                    self.safety.shoulder_up(speed_forward=60, speed_reverse=10)
+                    safety_variables['safety_shoulder'] = True
+                    self.safety.gripper_action('open', 'safety')
+                    safety_variables['gripper_safety'] = True
+                    states['safety_active'] = False
+                    self.sensor.set_color(_LED_READY)
 
                 data = {'state': 'approved'}
                 self.comms.send_message('safety_service', data)
@@ -316,18 +403,19 @@ class RoboticServices:
                 self.safety_variables = {'safety_shoulder': False,'gripper_safety': False}
                     
             elif service == 'scan':
-                while not self.scan_variables['scan_end']:
-                    if self.scan_variables['scan_start']:
+                sv = self.scan_variables
+                while not sv['scan_end']:
+                    if sv['scan_start']:
                         scan_init = self._execute_start_scan()
                         if scan_init:
-                            self.scan_variables['scan_start'] = False
-                            self.scan_variables['scan_update'] = True
-                    elif self.scan_variables['scan_update']:
+                            sv['scan_start'] = False
+                            sv['scan_update'] = True
+                    elif sv['scan_update']:
                         scan_end = self._execute_scan_service()
                         if scan_end:
-                            self.scan_variables['scan_end'] = True
-                            self.scan_variables['scan_start'] = True
-                            self.scan_variables['scan_update'] = False
+                            sv['scan_end'] = True
+                            sv['scan_start'] = True
+                            sv['scan_update'] = False
                             
                 scan_data = self.mapping.get_objects_map()
                 data = {'state': 'complete','objects': scan_data,}
@@ -356,40 +444,40 @@ class RoboticServices:
         speed = self.states['scan_params'][3]
         self.scan_variables['start_time'] = time.time()
         self.control.base_motor.spin(FORWARD, speed, RPM)
-        self.sensor.set_color(LED_COLORS['RUNNING'])
+        self.sensor.set_color(_LED_RUNNING)
         return True
         
             
     def _execute_scan_service(self):
+        sv = self.scan_variables
         current_angle = self.sensor.get_angle()
         
-        delta = current_angle - self.scan_variables['last_angle']
-        if delta > 180: delta -= 360
-        elif delta < -180: delta += 360
+        delta = (current_angle - sv['last_angle'] + 180) % 360 - 180
         
-        self.scan_variables['accumulated_rotation'] += abs(delta)
-        self.scan_variables['last_angle'] = current_angle
+        sv['accumulated_rotation'] += abs(delta)
+        sv['last_angle'] = current_angle
         
-        data = self.perception.process_sensor_distance(self.sensor.base_distance, 50, 345)
+        dist, size, detected = self.perception.process_sensor_distance(self.sensor.base_distance, 50, 345)
         
-        if data['detected'] and not self.scan_variables['pause_for_object']:
-            self.scan_variables['pause_for_object'] = True
+        if detected and not sv['pause_for_object']:
+            sv['pause_for_object'] = True
             self.control.base_motor.stop()
             self.comms.send_message('scan_service', {
                 'state': 'detected',
                 'angle': current_angle,
-                'distance': data['distance'],
-                'size': data['size']
+                'distance': dist,
+                'size': size
             })
             wait(2, SECONDS)
             self.control.base_motor.spin(FORWARD, self.states['scan_params'][3], RPM)
             
-        elif not data['detected']:
-            self.scan_variables['pause_for_object'] = False
+        elif not detected:
+            sv['pause_for_object'] = False
             
-        self.mapping.process_object_detection(current_angle, data['size'], data['distance'])
+        self.mapping.process_object_detection(current_angle, size, dist)
             
-        if self.scan_variables['accumulated_rotation'] >= 360 or time.time() - self.scan_variables['start_time'] >= self.scan_variables['timeout']:
+        # clock read here, after any pause for a detected object
+        if sv['accumulated_rotation'] >= 360 or time.time() - sv['start_time'] >= sv['timeout']:
             self.control.base_motor.stop()
             return True
                 
@@ -403,7 +491,9 @@ class RoboticServices:
                 else:
                     angle = data['angle'] + 4
                 self.control.move_motor_to_angle(self.control.base_motor, angle + 4, data.get('speed', 20))
-                self.comms.send_message(msg_type, {'joint': data['joint'],'state': 'completed','target_angle': data['angle'],'actual_angle': self.sensor.get_angle(),'accuracy': abs(data['angle'] - self.sensor.get_angle())})
+                # one heading read for both fields, so accuracy matches the reported angle
+                actual_angle = self.sensor.get_angle()
+                self.comms.send_message(msg_type, {'joint': data['joint'],'state': 'completed','target_angle': data['angle'],'actual_angle': actual_angle,'accuracy': abs(data['angle'] - actual_angle)})
                 
             elif data['joint'] == 'arm':
                 object_distance = data['distance']
@@ -412,16 +502,12 @@ class RoboticServices:
                         self.comms.send_message(msg_type, {'joint': data['joint'], 'state': 'completed'})
                         
                 elif data['action'] == 'up':
-                    self.sensor.set_color(LED_COLORS['WARNING'])
-                    shoulder_complete = False
-                    while not shoulder_complete:
-                        shoulder_complete = self.safety.check_shoulder_safety(80, 10)
+                    self.sensor.set_color(_LED_WARNING)
+                    self.safety.shoulder_up(80, 10)
                     self.comms.send_message(msg_type, {'joint': data['joint'], 'state': 'completed'})
                     
             elif data['joint'] == 'gripper':
-                gripper_completed = False
-                while not gripper_completed:
-                    gripper_completed = self.safety.gripper_action(data.get('action', 'close'), 'pick')
+                self.safety.gripper_action(data.get('action', 'close'), 'pick')
                 self.comms.send_message(msg_type, {'joint': data['joint'], 'state': 'completed'})
                 
             
@@ -429,15 +515,18 @@ class RoboticServices:
             self.comms.send_message(msg_type, {'joint': data['joint'], 'error': str(e)})
             
     def _execute_pick_place_sequence(self, object_distance: float = 0.0, action: str = 'pick'):
-        timeout = time.time() + 20
         start_time = time.time()
+        timeout = start_time + 20
         self.control.gripper_motor.set_stopping(BRAKE)
         
-        while time.time() < timeout:
-            data = self.perception.process_sensor_distance(self.sensor.gripper_distance, 0, 40)
+        while True:
+            now = time.time()
+            if now >= timeout:
+                break
+            detected = self.perception.process_sensor_distance(self.sensor.gripper_distance, 0, 40)[2]
             
             if action == 'pick':
-                if data['detected']:
+                if detected:
                     self.control.shoulder_motor.set_stopping(BRAKE)
                     self.control.elbow_motor.set_stopping(BRAKE)
                     #wait(500, MSEC)
@@ -451,7 +540,7 @@ class RoboticServices:
                     shoulder_speed = 10
                     elbow_speed = 0
             else:
-                if time.time() - start_time >= 3:
+                if now - start_time >= 3:
                     self.control.shoulder_motor.set_stopping(BRAKE)
                     self.control.elbow_motor.set_stopping(BRAKE)
                     #wait(500, MSEC)
@@ -465,39 +554,43 @@ class RoboticServices:
             #wait(100, MSEC)
         return False
         
+    def _on_check(self, msg_type, data):
+        self.states['check_active'] = True
+        
+    def _on_safety(self, msg_type, data):
+        self.states['safety_active'] = True
+        
+    def _on_scan(self, msg_type, data):
+        self.states['scan_params'] = (time.time(), 0.0, 0, data.get('speed', 20))
+        self.reset_scan_variables()
+        self.states['scan_active'] = True
+        
     def process_message(self, msg):
         if not msg: return
         
         msg_type = msg['type'].lower()
-        data = msg.get('data', {})
-        
-        if msg_type == 'check_service':
-            self.states['check_active'] = True
-            
-        elif msg_type == 'safety_service':
-            self.states['safety_active'] = True
-            
-        elif msg_type == 'scan_service':
-            self.states['scan_params'] = (time.time(), 0.0, 0, data.get('speed', 20))
-            self.reset_scan_variables()
-            self.states['scan_active'] = True
-            
-        elif msg_type == 'pick_service' or msg_type == 'place_service':
-            self._pick_place_service(msg_type, data)
+        handler = self._dispatch.get(msg_type)
+        if handler is not None:
+            handler(msg_type, msg.get('data', {}))
     
     def run(self):
         self.comms.initialize()
-        self.sensor.set_color(LED_COLORS['INIT'])
+        self.sensor.set_color(_LED_INIT)
+        
+        read_message = self.comms.read_message
+        process_message = self.process_message
+        run_service = self.run_service
+        states = self.states
+        services = (('check_active', 'check'), ('safety_active', 'safety'), ('scan_active', 'scan'))
         while True:
             try:
-                msg = self.comms.read_message()
+                msg = read_message()
                 
                 if msg:
-                    self.process_message(msg)
+                    process_message(msg)
                     
-                    if self.states['check_active']: self.run_service('check')
-                    if self.states['safety_active']: self.run_service('safety')
-                    if self.states['scan_active']: self.run_service('scan')
+                    for flag, service in services:
+                        if states[flag]: run_service(service)
                     
             except Exception as e:
                 self.sensor.print_screen("Error: {}".format(str(e)[:20]), 1, 95)
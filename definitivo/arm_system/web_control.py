@@ -17,6 +17,15 @@ log.basicConfig(level=log.INFO, format="%(asctime)s - %(levelname)s - %(message)
 
 app = Flask(__name__)
 
+# Rangos válidos para servos continuos
+# 180° = parar, <180° = giro horario, >180° = giro antihorario
+LÍMITES_ARTICULACIÓN = {
+    'base': (0, 360),
+    'shoulder': (0, 360),  # Control de velocidad
+    'elbow': (0, 360),     # Control de velocidad
+    'gripper': (0, 360)    # Control de velocidad
+}
+
 class ControladorWeb:
     """Controlador web para interfaz del brazo robótico"""
 
@@ -65,14 +74,7 @@ class ControladorWeb:
             ángulo = int(ángulo)
 
             # Validar rangos para servos continuos
-            límites_articulación = {
-                'base': (0, 360),      # 180° = parar, <180° = giro horario, >180° = giro antihorario
-                'shoulder': (0, 360),  # Control de velocidad
-                'elbow': (0, 360),     # Control de velocidad
-                'gripper': (0, 360)    # Control de velocidad
-            }
-
-            ángulo_min, ángulo_max = límites_articulación[articulación]
+            ángulo_min, ángulo_max = LÍMITES_ARTICULACIÓN[articulación]
             if not (ángulo_min <= ángulo <= ángulo_max):
                 return False, f"Ángulo de {articulación.title()} debe estar entre {ángulo_min}-{ángulo_max}°"
 
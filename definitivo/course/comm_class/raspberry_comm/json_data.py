@@ -55,7 +55,7 @@ class SerialCommunication:
                     char = self.com.read()
                     if char == self.message_end:
                         message = self.buffer.decode()
-                        self.buffer = bytearray()
+                        self.buffer.clear()
                         try:
                             data = json.loads(message)
                             self._process_message(data)